@@ -0,0 +1,228 @@
+""" End-to-end dataset production benchmark of the three tools.
+
+Runs the palm (`load_image`, `DatasetProducing.split/save`), parcel
+(`resize_image`, `shppoly_extract`, `_poly_mask_generating`,
+`_save_to_local`) and vehicle (`ODCropData.extract`) pipelines on
+synthetic fixtures, each tool in its own process so the peak RSS
+is its own, and reports per-stage timings, throughput and peak
+memory. The results are saved as JSON to compare commits.
+
+Usage (from the repository root):
+    python -m benchmarks.dataset [--size 4096] [--format files|shards|arrays]
+                                 [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from pkgs.common.profiling import peak_rss_mb
+from . import fixtures
+
+
+tools = ('palm', 'parcel', 'vehicle')
+
+
+class Stages:
+
+    def __init__(self):
+        """ Wall time of the named pipeline stages """
+        self.times = {}
+
+    @contextmanager
+    def __call__(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.) + time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        return sum(self.times.values())
+
+
+def dir_size_mb(path: Path) -> float:
+    return sum(p.stat().st_size for p in Path(path).rglob('*') if p.is_file()) / 1024**2
+
+
+def count_tiles(out_dir: Path) -> int:
+    index = out_dir.joinpath('shards', 'index.json')
+    if index.exists():
+        return len(json.loads(index.read_text())['samples'])
+    keys = out_dir.joinpath('arrays', 'keys.txt')
+    if keys.exists():
+        return len(keys.read_text().split())
+    return len(list(out_dir.glob('JPEGImages/*')))
+
+
+def bench_palm(tmp: Path, args) -> dict:
+    from pkgs.palm.item import DatasetProducing
+    from pkgs.palm.utils.imutils import load_image
+
+    im_path, csv_path = tmp.joinpath('palm.tif'), tmp.joinpath('palm_img_pos.csv')
+    fixtures.make_geotiff(im_path, args.size, args.size, args.pixel_size, args.seed)
+    fixtures.make_palm_csv(csv_path, args.palms, args.size, args.size, args.seed)
+
+    stages = Stages()
+    with stages('load_image'):
+        raster, _, _, _ = load_image(im_path, args.pixel_size)
+    with stages('read_csv'):
+        pos = np.loadtxt(str(csv_path), dtype=int, delimiter=',')
+
+    ds = DatasetProducing(raster=raster, pos=pos, reso=args.pixel_size, n_class=1, seed=args.seed)
+    with stages('split'):
+        ds.split(args.tile, args.overlap, windows=np.empty((0, 4), dtype=int))
+    with stages('save'):
+        ds.save(filename='palm', save_dir=tmp)
+
+    out_dir = tmp.joinpath('PascalVOC')
+    return dict(stages=stages, tiles=count_tiles(out_dir), out_mb=dir_size_mb(out_dir))
+
+
+def bench_parcel(tmp: Path, args) -> dict:
+    from pkgs.common.tilestats import valid_pixels
+    from pkgs.parcel.main import parcelGUI
+    from pkgs.parcel.utils.geomutil import geo_to_image
+    from pkgs.parcel.utils.imutils import resize_image
+    from pkgs.parcel.utils.shputil import shppoly_extract, rgnshp_generate
+
+    im_path, shp_path = tmp.joinpath('parcel.tif'), tmp.joinpath('parcel.shp')
+    tfw = fixtures.make_geotiff(im_path, args.size, args.size, args.pixel_size, args.seed)
+    fixtures.make_shapefile(shp_path, tfw, args.size, args.size, args.parcels, seed=args.seed)
+
+    stages = Stages()
+    with stages('resize_image'):
+        im, im_shape, factor, tfw = resize_image(im_path, args.pixel_size)
+    with stages('shppoly_extract'):
+        polys = shppoly_extract(shp_path, rgnshp_generate(im_path, tfw))
+
+    # the GUI state `_poly_mask_generating` and `_save_to_local` rely on
+    items = [SimpleNamespace(img_coords=geo_to_image(p.exterior.coords, tfw, factor)) for p in polys]
+    gui = SimpleNamespace(back_im=im, _im_shape=im_shape, _factor=factor,
+                          polyitems=[items], colors=[(0, 128, 255)], _filename='parcel')
+
+    with stages('_poly_mask_generating'):
+        mask, visual = parcelGUI._poly_mask_generating(gui)
+    out_dir = tmp.joinpath('PascalVOC')
+    window = [0, 0, int(im_shape[1] * factor), int(im_shape[0] * factor)]
+    with stages('_save_to_local'):
+        parcelGUI._save_to_local(gui, [im, mask, visual], [window], args.tile, args.overlap, out_dir,
+                                 {'image.png': 'JPEGImages',
+                                  'label.png': 'SegmentationClass',
+                                  'visual.png': 'VisualImages'},
+                                 valid_pixels(im))
+
+    return dict(stages=stages, tiles=count_tiles(out_dir), out_mb=dir_size_mb(out_dir))
+
+
+def bench_vehicle(tmp: Path, args) -> dict:
+    from pkgs.vehicle.ODCrop import ODCropData
+
+    root = fixtures.make_voc(tmp.joinpath('vehicle'), args.frames, seed=args.seed)
+    bboxes = [[0, 0, 960, 1080], [960, 0, 1920, 1080]]
+
+    stages = Stages()
+    with stages('ODCropData'):
+        data = ODCropData(root, bboxes, angles=[0, 90])
+    with stages('extract'):
+        for path in sorted(root.joinpath('images').glob('*.png')):
+            data.extract(path)
+    with stages('split'):
+        data.split()
+
+    out_dir = root.joinpath('PascalVOC')
+    return dict(stages=stages, tiles=len(data.all_filename), out_mb=dir_size_mb(out_dir))
+
+
+def run_tool(name: str, args) -> dict:
+    """ Running one tool's pipeline in this process """
+    from pkgs.common import config
+    config.output_format = args.format
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = globals()[f'bench_{name}'](Path(tmp), args)
+
+    stages = result['stages']
+    return {
+        'stages': stages.times,
+        'total_s': stages.total,
+        'tiles': result['tiles'],
+        'tiles_per_s': result['tiles'] / stages.total if stages.total else 0.,
+        'output_mb': result['out_mb'],
+        'mb_per_s': result['out_mb'] / stages.total if stages.total else 0.,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def git_commit() -> str:
+    proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def print_report(results: dict, baseline: dict=None):
+    print(f'{"tool":<10}{"stage":<24}{"time (s)":>10}{"vs base":>10}')
+    for name, r in results['tools'].items():
+        base = (baseline or {}).get('tools', {}).get(name, {}).get('stages', {})
+        for stage, t in r['stages'].items():
+            ratio = f'{t / base[stage]:>9.2f}x' if base.get(stage) else ''
+            print(f'{name:<10}{stage:<24}{t:>10.3f}{ratio:>10}')
+        peak = '' if r['peak_rss_mb'] is None else f'  peak {r["peak_rss_mb"]:.0f} MB'
+        print(f'{name:<10}{"-> " + str(r["tiles"]) + " tiles":<24}{r["total_s"]:>10.3f}'
+              f'  {r["tiles_per_s"]:.1f} tiles/s  {r["mb_per_s"]:.1f} MB/s{peak}')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--tools', nargs='+', choices=tools, default=list(tools))
+    parser.add_argument('--size', type=int, default=4096, help='raster width and height (px)')
+    parser.add_argument('--pixel-size', type=float, default=0.05, help='raster resolution (m)')
+    parser.add_argument('--tile', type=int, default=512, help='tile size (px)')
+    parser.add_argument('--overlap', type=float, default=0.2, help='tiles overlap ratio')
+    parser.add_argument('--palms', type=int, default=5000, help='palm positions')
+    parser.add_argument('--parcels', type=int, default=2000, help='parcel polygons')
+    parser.add_argument('--frames', type=int, default=50, help='vehicle frames')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=('files', 'shards', 'arrays'), default='files',
+                        help='dataset output format')
+    parser.add_argument('--output', type=Path, help='saving the results as JSON')
+    parser.add_argument('--compare', type=Path, help='baseline results JSON')
+    parser.add_argument('--worker', choices=tools, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(run_tool(args.worker, args), sys.stdout)
+        return 0
+
+    results = {
+        'commit': git_commit(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'params': {k: v for k, v in vars(args).items() if k not in ('output', 'compare', 'worker', 'tools')},
+        'tools': {},
+    }
+    forwarded = list(argv if argv is not None else sys.argv[1:])
+    for name in args.tools:
+        # a fresh process per tool keeps the peak RSS apart
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.dataset', *forwarded, '--worker', name],
+                              stdout=subprocess.PIPE, text=True, check=True)
+        results['tools'][name] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+""" Synthetic inputs of configurable size for the benchmarks:
+GeoTIFF rasters, parcel shapefiles, palm position CSVs and
+Pascal VOC frame directories laid out as the tools expect.
+"""
+import numpy as np
+from pathlib import Path
+
+from pkgs.common.lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+gdal = lazy_import('osgeo.gdal', 'gdal')
+ogr = lazy_import('osgeo.ogr', 'ogr')
+osr = lazy_import('osgeo.osr', 'osr')
+pascal_voc_writer = lazy_import('pascal_voc_writer')
+
+
+origin = (250000., 2700000.)  # TWD97 / TM2 (EPSG:3826) easting, northing
+epsg = 3826
+
+
+def texture(height: int, width: int, rng: np.random.Generator) -> np.ndarray:
+    """ Smooth random RGB texture, compressing and
+    decoding like an aerial image rather than noise """
+    small = rng.integers(0, 256, size=(max(height // 16, 1), max(width // 16, 1), 3), dtype=np.uint8)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
+def make_geotiff(path, width: int, height: int, pixel_size: float=0.05, seed: int=0) -> tuple:
+    """ Writing a 3 bands georeferenced GeoTIFF
+
+    # Returns:
+        geotransform (tfw) of the raster
+    """
+    rng = np.random.default_rng(seed)
+    im = texture(height, width, rng)
+
+    tfw = (origin[0], pixel_size, 0., origin[1], 0., -pixel_size)
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(epsg)
+
+    ds = gdal.GetDriverByName('GTiff').Create(str(path), width, height, 3, gdal.GDT_Byte)
+    ds.SetGeoTransform(tfw)
+    ds.SetProjection(srs.ExportToWkt())
+    for band in range(3):
+        ds.GetRasterBand(band + 1).WriteArray(im[..., band])
+    ds.FlushCache()
+    ds = None
+    return tfw
+
+
+def make_palm_csv(path, n: int, width: int, height: int, seed: int=0) -> np.ndarray:
+    """ Writing `n` palm positions (image coordinates) as the headerless CSV of the palm tool """
+    rng = np.random.default_rng(seed)
+    pos = np.stack([rng.integers(0, width, n), rng.integers(0, height, n)], axis=1)
+    np.savetxt(str(path), pos, fmt='%d', delimiter=',')
+    return pos
+
+
+def make_shapefile(path, tfw: tuple, width: int, height: int, n: int,
+                   vertices: int=24, seed: int=0):
+    """ Writing `n` star-shaped parcel polygons
+    lying inside the raster extent of `tfw` """
+    rng = np.random.default_rng(seed)
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(epsg)
+
+    driver = ogr.GetDriverByName('ESRI Shapefile')
+    if Path(path).exists():
+        driver.DeleteDataSource(str(path))
+    ds = driver.CreateDataSource(str(path))
+    layer = ds.CreateLayer(Path(path).stem, srs, ogr.wkbPolygon)
+    defn = layer.GetLayerDefn()
+
+    radius = max(min(width, height) / (2 * np.sqrt(n)), 4)
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    for _ in range(n):
+        cx = rng.uniform(radius, width - radius)
+        cy = rng.uniform(radius, height - radius)
+        r = radius * rng.uniform(0.5, 0.95, vertices)
+        px = cx + r * np.cos(angles)
+        py = cy + r * np.sin(angles)
+
+        ring = ogr.Geometry(ogr.wkbLinearRing)
+        for x, y in zip(px, py):
+            ring.AddPoint_2D(tfw[0] + x * tfw[1], tfw[3] + y * tfw[5])
+        ring.CloseRings()
+        geom = ogr.Geometry(ogr.wkbPolygon)
+        geom.AddGeometry(ring)
+
+        feature = ogr.Feature(defn)
+        feature.SetGeometry(geom)
+        layer.CreateFeature(feature)
+    ds = None
+
+
+def make_voc(root, frames: int, width: int=1920, height: int=1080,
+             objects: int=20, seed: int=0) -> Path:
+    """ Writing `frames` images and their Pascal VOC annotations
+    into `root/images` and `root/bnboxes` (vehicle tool layout)
+
+    # Returns:
+        root path
+    """
+    rng = np.random.default_rng(seed)
+    root = Path(root)
+    im_dir, bnb_dir = root.joinpath('images'), root.joinpath('bnboxes')
+    im_dir.mkdir(parents=True, exist_ok=True)
+    bnb_dir.mkdir(parents=True, exist_ok=True)
+
+    for i in range(frames):
+        im_path = im_dir.joinpath(f'{i:06d}.png')
+        cv2.imwrite(str(im_path), texture(height, width, rng))
+
+        writer = pascal_voc_writer.Writer(str(im_path), width, height)
+        for _ in range(objects):
+            w, h = rng.integers(30, 200, 2)
+            x, y = rng.integers(0, width - w), rng.integers(0, height - h)
+            writer.addObject('car', int(x), int(y), int(x + w), int(y + h))
+        writer.save(str(bnb_dir.joinpath(f'{i:06d}.xml')))
+    return root
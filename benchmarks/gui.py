@@ -0,0 +1,199 @@
+""" Interaction latency of the three canvases with many items.
+
+Runs offscreen (`QT_QPA_PLATFORM=offscreen`), fills
+`PalmPositionCanvas`, `ParcelCanvas` and `LabelCanvas` with N
+synthetic items, then replays scripted interactions (zoom in/out,
+pan, hovering mouse moves hit-testing the scene, and dragging a
+handle), each event being followed by its repaint. Reports the
+latency percentiles per interaction.
+
+Usage (from the repository root):
+    python -m benchmarks.gui [--items 10000 100000] [--output gui.json]
+"""
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+
+canvases = ('palm', 'parcel', 'vehicle')
+view_size = QRect(0, 0, 1280, 800)
+
+
+def flush():
+    """ Delivering the posted events, so the scene
+    updates and the resulting repaints are done """
+    for _ in range(2):
+        QApplication.sendPostedEvents()
+        QApplication.processEvents()
+
+
+def timed(action) -> float:
+    """ Latency (ms) of `action` including its repaint """
+    start = time.perf_counter()
+    action()
+    flush()
+    return (time.perf_counter() - start) * 1e3
+
+
+def background(size: int) -> QPixmap:
+    pixmap = QPixmap(size, size)
+    pixmap.fill(QColor(90, 110, 80))
+    return pixmap
+
+
+def star_polygon(cx: float, cy: float, radius: float, rng, vertices: int=24):
+    from shapely.geometry import Polygon
+    angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    r = radius * rng.uniform(0.5, 0.95, vertices)
+    return Polygon(np.stack([cx + r * np.cos(angles), cy + r * np.sin(angles)], axis=1))
+
+
+def build_palm(n: int, size: int, rng):
+    from pkgs.palm.item import PalmPositionCanvas, RectItemHandle
+
+    view = PalmPositionCanvas(None, view_size)
+    view.setPixmap(background(size))
+    view.set_factor(1.)
+    view.palm_pos_data_loading(rng.integers(0, size, (n, 2)))
+
+    win = RectItemHandle(size // 4, size // 4, size // 2, size // 2, handleSize=100)
+    view.add_crop_win_to_scene(win)
+    return view, win, win.handles[win.handleBottomRight].center()
+
+
+def build_parcel(n: int, size: int, rng):
+    from pkgs.parcel.item import ParcelCanvas, PolyItemHandle
+    from pkgs.parcel.utils.geomutil import simplify_layer
+
+    view = ParcelCanvas(None, view_size)
+    view.setPixmap(background(size))
+
+    tfw, radius = (0., 1., 0., 0., 0., 1.), max(size / (2 * np.sqrt(n)), 4)
+    polys = []
+    for cx, cy in rng.uniform(radius, size - radius, (n, 2)):
+        poly = PolyItemHandle(star_polygon(cx, cy, radius, rng), tfw, 1., (255, 128, 0))
+        poly.changable = True
+        view.add_item_to_scene(poly)
+        polys.append(poly)
+    for poly, levels in zip(polys, simplify_layer([p.geometry() for p in polys])):
+        poly.set_levels(levels)
+
+    target = polys[len(polys) // 2]
+    x, y = target.img_coords[0]
+    return view, target, QPointF(x, y)
+
+
+def build_vehicle(n: int, size: int, rng):
+    from pkgs.vehicle.item.canvas import LabelCanvas
+    from pkgs.vehicle.item.rect_handle import RectItemHandle
+
+    view = LabelCanvas(None, view_size)
+    view.setPixmap(background(size))
+
+    items = []
+    for x, y, w, h in np.concatenate([rng.integers(0, size - 200, (n, 2)),
+                                      rng.integers(20, 200, (n, 2))], axis=1):
+        item = RectItemHandle(int(x), int(y), int(w), int(h))
+        item.setLabel('car')
+        view.add_item_to_scene(item)
+        items.append(item)
+
+    target = items[len(items) // 2]
+    return view, target, target.handles[target.handleBottomRight].center()
+
+
+def mouse_move(view: QGraphicsView, pos: QPoint):
+    event = QMouseEvent(QEvent.MouseMove, QPointF(pos), Qt.NoButton, Qt.NoButton, Qt.NoModifier)
+    QApplication.sendEvent(view.viewport(), event)
+
+
+def press_handle(item, pos: QPointF):
+    """ Item state of a shift-press on the handle at `pos` (item coordinates) """
+    item.handleSelected = item.handleAt(pos)
+    item.mousePressPos = pos
+    if hasattr(item, 'mousePressRect'):
+        item.mousePressRect = item.rect()
+
+
+def replay(name: str, n: int, args) -> dict:
+    """ Return {interaction: list of latencies (ms)} """
+    rng = np.random.default_rng(args.seed)
+    latencies = {}
+
+    start = time.perf_counter()
+    view, target, handle = globals()[f'build_{name}'](n, args.size, rng)
+    view.show()
+    flush()
+    latencies['load'] = [(time.perf_counter() - start) * 1e3]
+
+    zoom = []
+    for _ in range(args.repeat):
+        zoom += [timed(view.zoom_in) for _ in range(5)]
+        zoom += [timed(view.zoom_out) for _ in range(5)]
+    latencies['zoom'] = zoom
+
+    for _ in range(3): view.zoom_in()
+    bar = view.horizontalScrollBar()
+    step = max((bar.maximum() - bar.minimum()) // (10 * args.repeat), 1)
+    latencies['pan'] = [timed(lambda: bar.setValue(bar.value() + step)) for _ in range(10 * args.repeat)]
+
+    w, h = view.viewport().width(), view.viewport().height()
+    points = [QPoint(int(x), int(y)) for x, y in rng.uniform(0, 1, (20 * args.repeat, 2)) * (w, h)]
+    latencies['hover'] = [timed(lambda p=p: mouse_move(view, p)) for p in points]
+
+    view.centerOn(target.mapToScene(handle))
+    flush()
+    press_handle(target, handle)
+    latencies['drag'] = [timed(lambda i=i: target.interactiveResize(handle + QPointF(i, i)))
+                         for i in range(1, 20 * args.repeat + 1)]
+    target.handleSelected = None
+
+    view.close()
+    view.deleteLater()
+    flush()
+    return latencies
+
+
+def summary(samples: list) -> dict:
+    p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+    return {'n': len(samples), 'p50': p50, 'p90': p90, 'p99': p99, 'max': max(samples)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--canvases', nargs='+', choices=canvases, default=list(canvases))
+    parser.add_argument('--items', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--size', type=int, default=8192, help='background image size (px)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, help='saving the percentiles as JSON')
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    results = {}
+    print(f'{"canvas":<10}{"items":>8}  {"event":<8}{"p50 (ms)":>10}{"p90":>9}{"p99":>9}{"max":>9}')
+    for name in args.canvases:
+        for n in args.items:
+            stats = {event: summary(s) for event, s in replay(name, n, args).items()}
+            results.setdefault(name, {})[n] = stats
+            for event, s in stats.items():
+                print(f'{name:<10}{n:>8}  {event:<8}{s["p50"]:>10.2f}{s["p90"]:>9.2f}{s["p99"]:>9.2f}{s["max"]:>9.2f}')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
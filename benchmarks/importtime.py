@@ -0,0 +1,82 @@
+""" Import-time budget check of the three tools.
+
+Runs `python -X importtime` on the GUI module of each tool and
+fails (exit code 1) if its cumulative import time exceeds the
+budget, or if one of the heavy libraries, which must only be
+loaded when a file is opened, is imported at startup.
+
+The image build runs it with `--heavy-only`, the timings of a
+shared builder being too noisy to fail on, so a heavy import
+leaking into the startup path breaks the build.
+
+Usage (from the repository root):
+    python -m benchmarks.importtime [--budget 1.0] [--heavy-only]
+"""
+import argparse
+import subprocess
+import sys
+
+
+tools = {
+    'palm': 'pkgs.palm.palm_gui',
+    'parcel': 'pkgs.parcel.main',
+    'vehicle': 'pkgs.vehicle.ui',
+}
+
+heavy_modules = ('cv2', 'osgeo', 'gdal', 'ogr', 'scipy', 'skimage',
+                 'pandas', 'shapely', 'PIL', 'pascal_voc_writer')
+
+
+def import_times(module: str) -> dict:
+    """ Return {module name: cumulative import time (s)} of a fresh interpreter
+
+    Only the first occurrence of each name is kept, which is
+    the outermost (cumulative) entry of that module.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True)
+    if proc.returncode:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line: continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit(): continue  # header line
+        times.setdefault(name.strip(), int(cumulative) / 1e6)
+    return times
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='cumulative import time budget per tool (s)')
+    parser.add_argument('--heavy-only', action='store_true',
+                        help='only failing on the heavy imports, not the budget')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name, module in tools.items():
+        try:
+            times = import_times(module)
+        except ImportError as err:
+            print(f'{name:<10}{"-":>8}    import failed: {err}')
+            failed = True
+            continue
+        total = times.get(module, 0.)
+        heavy = sorted({m.split('.')[0] for m in times} & set(heavy_modules))
+
+        status = 'ok'
+        if total > args.budget and not args.heavy_only:
+            status = f'over budget ({args.budget:.2f} s)'
+        if heavy:
+            status = f'heavy imports: {", ".join(heavy)}'
+        failed |= status != 'ok'
+        print(f'{name:<10}{total:>8.3f} s  {status}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+""" Time to first window of the three tools, with the `.ui`
+files parsed at runtime (`loadUi`) and precompiled (`load_ui`).
+
+Usage (from the repository root):
+    python -m benchmarks.startup [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from pkgs.common.uiloader import compile_ui
+
+
+tools = {
+    'palm': ('pkgs.palm.palm_gui', 'palmGUI', 'GUI/dialog_palm.ui'),
+    'parcel': ('pkgs.parcel.main', 'parcelGUI', 'GUI/dialog_parcel.ui'),
+    'vehicle': ('pkgs.vehicle.ui', 'carUI', 'GUI/widget_vehicle.ui'),
+}
+
+first_window = '''
+import sys
+from pathlib import Path
+from PyQt5.QtWidgets import QApplication
+import pkgs.common.uiloader as uiloader
+uiloader.compiled_dir = Path({compiled_dir!r})
+if {parse!r}:
+    # measuring the plain loadUi path without the recompiling
+    uiloader._compiled_form = lambda ui_path: None
+    uiloader.compile_ui = lambda ui_path, dir=None: None
+app = QApplication(sys.argv)
+from {module} import {cls}
+window = {cls}()
+window.show()
+app.processEvents()
+'''
+
+
+def time_first_window(module: str, cls: str, compiled_dir: str, parse: bool=False) -> float:
+    """ Wall time of a fresh interpreter until the window is shown """
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    code = first_window.format(module=module, cls=cls, compiled_dir=compiled_dir, parse=parse)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f'{"tool":<10}{"loadUi (s)":>14}{"compiled (s)":>14}{"speedup":>10}')
+    for name, (module, cls, ui_path) in tools.items():
+        with tempfile.TemporaryDirectory() as compiled_dir:
+            compile_ui(ui_path, compiled_dir)
+            compiled = [time_first_window(module, cls, compiled_dir) for _ in range(args.repeat)]
+            parsed = [time_first_window(module, cls, compiled_dir, parse=True) for _ in range(args.repeat)]
+
+        p, c = statistics.median(parsed), statistics.median(compiled)
+        print(f'{name:<10}{p:>14.3f}{c:>14.3f}{p / c:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
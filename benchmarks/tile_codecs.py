@@ -0,0 +1,113 @@
+""" Speed and size of the tile codecs of the dataset export.
+
+Encodes synthetic image tiles (aerial-like texture) and label tiles
+(filled circles, as the palm labels) with each codec setting of
+`pkgs.common.config`, through `pkgs.common.export.encode` as the
+exporters do, then decodes them back. Reports the encode and decode
+time per tile and the size per tile, to pick the speed/size trade-off
+per dataset.
+
+Usage (from the repository root):
+    python -m benchmarks.tile_codecs [--size 800] [--tiles 50] [--output codecs.json]
+"""
+import argparse
+import io
+import json
+import sys
+import time
+
+import numpy as np
+
+from pkgs.common import config
+from pkgs.common.export import encode, codec_of
+from pkgs.common.lazy import lazy_import
+
+from . import fixtures
+
+cv2 = lazy_import('cv2')
+
+
+# name -> config settings
+settings = {
+    'png-0': dict(image_codec='png', png_compression=0),
+    'png-1': dict(image_codec='png', png_compression=1),
+    'png-3': dict(image_codec='png', png_compression=3),
+    'png-6': dict(image_codec='png', png_compression=6),
+    'png-9': dict(image_codec='png', png_compression=9),
+    'jpg-75': dict(image_codec='jpg', jpeg_quality=75),
+    'jpg-95': dict(image_codec='jpg', jpeg_quality=95),
+    'webp-lossless': dict(image_codec='webp', webp_quality=101),
+    'webp-90': dict(image_codec='webp', webp_quality=90),
+    'npy': dict(image_codec='npy'),
+}
+
+
+def make_tiles(n: int, size: int, seed: int) -> tuple:
+    rng = np.random.default_rng(seed)
+    ims = [fixtures.texture(size, size, rng) for _ in range(n)]
+    lbs = []
+    for _ in range(n):
+        lb = np.zeros((size, size), dtype=np.uint8)
+        for x, y in rng.integers(0, size, (20, 2)):
+            cv2.circle(lb, (int(x), int(y)), size // 25, (1,), -1, cv2.LINE_AA)
+        lbs.append(lb)
+    return ims, lbs
+
+
+def decode(data: bytes, codec: str) -> np.ndarray:
+    if codec == 'npy':
+        return np.load(io.BytesIO(data))
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def measure(field: str, tiles: list) -> dict:
+    """ Encode/decode time (ms) and size (KB) per tile """
+    start = time.perf_counter()
+    encoded = [encode(field, tile) for tile in tiles]
+    encode_ms = (time.perf_counter() - start) * 1e3 / len(tiles)
+
+    codec = codec_of(field)
+    start = time.perf_counter()
+    for data in encoded:
+        decode(data, codec)
+    decode_ms = (time.perf_counter() - start) * 1e3 / len(tiles)
+
+    size_kb = sum(len(data) for data in encoded) / len(tiles) / 1024
+    return {'codec': codec, 'encode_ms': encode_ms, 'decode_ms': decode_ms, 'size_kb': size_kb,
+            'ratio': tiles[0].nbytes / 1024 / size_kb}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--settings', nargs='+', choices=settings, default=list(settings))
+    parser.add_argument('--size', type=int, default=800, help='tile size (px)')
+    parser.add_argument('--tiles', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, help='saving the results as JSON')
+    args = parser.parse_args(argv)
+
+    ims, lbs = make_tiles(args.tiles, args.size, args.seed)
+    defaults = {key: getattr(config, key) for s in settings.values() for key in s}
+
+    results = {}
+    print(f'{"setting":<15}{"tile":<7}{"codec":<6}{"encode (ms)":>12}{"decode (ms)":>12}'
+          f'{"size (KB)":>11}{"ratio":>8}')
+    for name in args.settings:
+        for key, value in settings[name].items():
+            setattr(config, key, value)
+        results[name] = {'image': measure('image.png', ims), 'label': measure('label.png', lbs)}
+        for key, value in defaults.items():
+            setattr(config, key, value)
+
+        for tile, r in results[name].items():
+            print(f'{name:<15}{tile:<7}{r["codec"]:<6}{r["encode_ms"]:>12.2f}{r["decode_ms"]:>12.2f}'
+                  f'{r["size_kb"]:>11.1f}{r["ratio"]:>8.1f}')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
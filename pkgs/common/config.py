@@ -0,0 +1,28 @@
+#######################
+# Dataset Export
+######################
+# 'files': one file per image, 'shards': tar shards,
+# 'arrays': raw .npy tile stores (segmentation tiles only)
+output_format = 'files'
+shard_maxcount = 1000  # samples per shard
+shard_maxsize_mb = 1024  # size bound of a shard
+max_nodata_ratio = 1.0  # tiles with at least this no-data fraction are dropped
+
+
+#######################
+# Tile Codec
+######################
+# None keeps the format of each tile field ('png', 'jpg'), or one
+# of 'png', 'jpg', 'webp', 'npy' (raw) for all the image tiles;
+# the label tiles never get a lossy codec
+image_codec = None
+png_compression = 1  # 0 (fastest) .. 9 (smallest)
+jpeg_quality = 95  # 0 .. 100
+webp_quality = 101  # 1 .. 100, above 100 for lossless
+
+
+#######################
+# Train/Val Split
+######################
+split_seed = 0  # seed of the name hashing
+split_block = 2048  # tiles whose corner lies in the same block (px) share the set
@@ -0,0 +1,291 @@
+import io
+import json
+import shutil
+import struct
+import tarfile
+import time
+import numpy as np
+from pathlib import Path
+
+from . import config
+from .lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+image_codecs = ('png', 'jpg', 'webp', 'npy')
+
+
+def codec_of(field: str) -> str:
+    """ File extension the sample field is encoded to: the field
+    own one (e.g. 'image.png'), unless `config.image_codec`
+    overrides it for the image fields, lossless only for labels """
+    name, ext = field.rsplit('.', 1)
+    codec = config.image_codec
+    if codec is None or ext not in image_codecs:
+        return ext
+    lossy = codec == 'jpg' or (codec == 'webp' and config.webp_quality <= 100)
+    return ext if name == 'label' and lossy else codec
+
+
+def _member(field: str) -> str:
+    return f'{field.rsplit(".", 1)[0]}.{codec_of(field)}'
+
+
+def _codec_params(codec: str) -> list:
+    if codec == 'png':
+        return [cv2.IMWRITE_PNG_COMPRESSION, config.png_compression]
+    if codec == 'jpg':
+        return [cv2.IMWRITE_JPEG_QUALITY, config.jpeg_quality]
+    if codec == 'webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, config.webp_quality]
+    return []
+
+
+def encode(field: str, im) -> bytes:
+    """ Encoding the image into the codec of the sample
+    field (see `codec_of`), with the compression settings
+    of the config, the already encoded fields (bytes)
+    are kept as is """
+    if isinstance(im, bytes):
+        return im
+
+    codec = codec_of(field)
+    if codec == 'npy':
+        buf = io.BytesIO()
+        np.save(buf, im)
+        return buf.getvalue()
+
+    ok, buf = cv2.imencode(f'.{codec}', im, _codec_params(codec))
+    if not ok:
+        raise OSError(f'Encoding {field} failed.')
+    return buf.tobytes()
+
+
+class DirectoryWriter:
+
+    def __init__(self, root, layout: dict):
+        """ Writing each field of the samples as a single file,
+        `root/{layout[field]}/{key}.{ext}`, the usual Pascal VOC
+        directories layout.
+
+        # Args:
+            root (str or Path): dataset directory
+            layout (dict): sample field (e.g. 'image.png') -> sub-directory
+        """
+        self.root = Path(root)
+        self.layout = layout
+        for subdir in layout.values():
+            self.root.joinpath(subdir).mkdir(parents=True, exist_ok=True)
+
+    def sample_key(self, key: str) -> str:
+        """ Name the sample `key` is stored under """
+        return key
+
+    def write(self, key: str, sample: dict):
+        """ Writing the sample `key`
+
+        # Args:
+            key (str): sample name
+            sample (dict): field -> image (numpy.ndarray) or encoded bytes
+        """
+        for field, data in sample.items():
+            path = self.root.joinpath(self.layout[field], f'{key}.{codec_of(field)}')
+            path.write_bytes(encode(field, data))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardWriter:
+
+    def __init__(self, root, maxcount: int=None, maxsize_mb: float=None, prefix: str='shard'):
+        """ Streaming the samples into tar shards of bounded
+        count and size, `root/shard-000000.tar`, ..., in the
+        WebDataset layout: the fields of a sample are the
+        consecutive members `{key}.{field}` (extension of its codec).
+
+        Closing the writer saves `root/index.json`, listing the
+        shards and the [key, shard, offset, size] byte range of
+        every sample, for random access without reading the tars.
+        The dots separate the fields of the member names, so they
+        are replaced by underscores in the keys, the original key
+        being recorded in the 'renamed' mapping of the index.
+
+        # Args:
+            root (str or Path): shards directory, emptied first
+            maxcount (int, optional): samples per shard
+            maxsize_mb (float, optional): size bound of a shard
+            prefix (str): shard file name prefix
+        """
+        self.root = Path(root)
+        shutil.rmtree(str(self.root), ignore_errors=True)
+        self.root.mkdir(parents=True)
+
+        self.maxcount = maxcount or config.shard_maxcount
+        self.maxsize = (maxsize_mb or config.shard_maxsize_mb) * 1024**2
+        self.prefix = prefix
+        self.shards = []
+        self.samples = []
+        self.renamed = {}  # {shard key: original key}
+        self._keys = set()
+        self._tar = None
+        self._count = 0
+        self._mtime = int(time.time())
+
+    def sample_key(self, key: str) -> str:
+        """ Name the sample `key` is stored under, without dots """
+        return key.replace('.', '_')
+
+    def write(self, key: str, sample: dict):
+        """ Appending the sample `key`, starting a
+        new shard when the current one is full
+
+        # Args:
+            key (str): sample name
+            sample (dict): field -> image (numpy.ndarray) or encoded bytes
+        """
+        name, key = key, self.sample_key(key)
+        if key in self._keys:
+            raise ValueError(f'Sample {name} written twice as {key}.')
+        self._keys.add(key)
+        if key != name:
+            self.renamed[key] = name
+
+        sample = {field: encode(field, data) for field, data in sample.items()}
+        # 512 bytes header and up to 511 bytes padding per member
+        size = sum(len(data) + 1024 for data in sample.values())
+        if self._tar is None or self._count >= self.maxcount or \
+                (self._count and self._tar.offset + size > self.maxsize):
+            self._next_shard()
+
+        start = self._tar.offset
+        for field, data in sample.items():
+            info = tarfile.TarInfo(f'{key}.{_member(field)}')
+            info.size = len(data)
+            info.mtime = self._mtime
+            self._tar.addfile(info, io.BytesIO(data))
+        self.samples.append([key, len(self.shards) - 1, start, self._tar.offset - start])
+        self._count += 1
+
+    def close(self):
+        self._close_shard()
+        index = {'shards': self.shards, 'samples': self.samples, 'renamed': self.renamed}
+        self.root.joinpath('index.json').write_text(json.dumps(index))
+
+    def _next_shard(self):
+        self._close_shard()
+        name = f'{self.prefix}-{len(self.shards):06d}.tar'
+        self._tar = tarfile.open(str(self.root.joinpath(name)), 'w')
+        self.shards.append({'name': name, 'count': 0, 'size': 0})
+        self._count = 0
+
+    def _close_shard(self):
+        if self._tar is None: return
+        self._tar.close()
+        self._tar = None
+        self.shards[-1]['count'] = self._count
+        self.shards[-1]['size'] = self.root.joinpath(self.shards[-1]['name']).stat().st_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _npy_header(dtype, shape: tuple, size: int=128) -> bytes:
+    """ `.npy` (version 1.0) header of fixed `size`, so it
+    can be rewritten in place once the tiles are counted """
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                   'fortran_order': False, 'shape': tuple(shape)})
+    assert len(header) < size - 10, 'Tile shape too long for the .npy header.'
+    header = header.ljust(size - 11) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+class ArrayWriter:
+
+    def __init__(self, root):
+        """ Appending the tiles of each sample field into one
+        array store, `root/{name}.npy` (e.g. 'label.png' ->
+        label.npy), one fixed-size record per tile, and the
+        sample keys into `root/keys.txt`.
+
+        The tiles are stored raw, training jobs memory-map
+        them with `np.load(path, mmap_mode='r')` and no
+        decoding. All the tiles of a field must share the
+        same shape and dtype.
+
+        # Args:
+            root (str or Path): arrays directory, emptied first
+        """
+        self.root = Path(root)
+        shutil.rmtree(str(self.root), ignore_errors=True)
+        self.root.mkdir(parents=True)
+        self.keys = []
+        self._stores = {}
+
+    def sample_key(self, key: str) -> str:
+        """ Name the sample `key` is stored under """
+        return key
+
+    def write(self, key: str, sample: dict):
+        """ Appending the sample `key`
+
+        # Args:
+            key (str): sample name
+            sample (dict): field -> tile (numpy.ndarray)
+        """
+        for field, tile in sample.items():
+            tile = np.ascontiguousarray(tile)
+            if field not in self._stores:
+                file = open(str(self.root.joinpath(f'{field.split(".")[0]}.npy')), 'wb')
+                file.write(_npy_header(tile.dtype, (0, *tile.shape)))
+                self._stores[field] = (file, tile.shape, tile.dtype)
+
+            file, shape, dtype = self._stores[field]
+            if tile.shape != shape or tile.dtype != dtype:
+                raise ValueError(f'Tile {key}.{field} {tile.dtype}{tile.shape} '
+                                 f'differs from the store {dtype}{shape}.')
+            file.write(tile.data)
+        self.keys.append(key)
+
+    def close(self):
+        for file, shape, dtype in self._stores.values():
+            file.seek(0)
+            file.write(_npy_header(dtype, (len(self.keys), *shape)))
+            file.close()
+        self._stores = {}
+        self.root.joinpath('keys.txt').write_text('\n'.join(self.keys))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(root, layout: dict, fmt: str=None):
+    """ Return the sample writer of the output format
+
+    # Args:
+        root (str or Path): dataset directory
+        layout (dict): sample field -> sub-directory of the 'files' format
+        fmt (str, optional): 'files', 'shards' or 'arrays'.
+            Defaults to `config.output_format`.
+    """
+    fmt = fmt or config.output_format
+    if fmt == 'files':
+        return DirectoryWriter(root, layout)
+    if fmt == 'shards':
+        return ShardWriter(Path(root).joinpath('shards'))
+    if fmt == 'arrays':
+        return ArrayWriter(Path(root).joinpath('arrays'))
+    raise ValueError(f'Unknown output format: {fmt}')
@@ -0,0 +1,28 @@
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+
+def items_at(scene: QGraphicsScene, pos: QPointF, item_type: type) -> list:
+    """ Return the `item_type` items under the scene position
+    `pos`, topmost first.
+
+    The lookup goes through the BSP tree index of the scene,
+    which Qt keeps in sync whenever an item is added, moved,
+    resized (after `prepareGeometryChange`) or removed, so
+    the cost doesn't grow with the number of items.
+
+    # Args:
+        scene (QGraphicsScene): scene to search
+        pos (QPointF): position in scene coordinates
+        item_type (type): item class to be matched
+    """
+    return [it for it in scene.items(pos, Qt.IntersectsItemShape, Qt.DescendingOrder)
+            if isinstance(it, item_type)]
+
+
+def item_at(scene: QGraphicsScene, pos: QPointF, item_type: type) -> QGraphicsItem:
+    """ Return the topmost `item_type` item under `pos`, None if no item. """
+    items = items_at(scene, pos, item_type)
+    return items[0] if items else None
+
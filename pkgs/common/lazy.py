@@ -0,0 +1,41 @@
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+
+    def __init__(self, *names: str):
+        """ Module placeholder importing the real module at
+        the first attribute access, so the heavy libraries
+        don't slow down the application start.
+
+        # Args:
+            names (str): candidate module names, the first
+                importable one is used (e.g. 'osgeo.gdal', 'gdal')
+        """
+        super().__init__(names[0])
+        self._names = names
+        self._module = None
+
+    def _load(self) -> types.ModuleType:
+        if self._module is None:
+            for name in self._names[:-1]:
+                try:
+                    self._module = importlib.import_module(name)
+                    return self._module
+                except ImportError:
+                    continue
+            self._module = importlib.import_module(self._names[-1])
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._names[0]}' ({state})>"
+
+
+def lazy_import(*names: str) -> LazyModule:
+    """ e.g. `cv2 = lazy_import('cv2')` in place of `import cv2` """
+    return LazyModule(*names)
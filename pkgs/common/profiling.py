@@ -0,0 +1,161 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# opt-in outputs, e.g. `PROFILE_TRACE=trace.json python main_palm.py`
+trace_path = os.environ.get('PROFILE_TRACE')     # `*.trace.json` for Chrome trace format
+cprofile_dir = os.environ.get('PROFILE_CPROFILE')  # directory of the per-stage `.prof` dumps
+
+
+def peak_rss_mb() -> float:
+    """ Peak resident memory of the process (MB),
+    None where `resource` is missing (Windows) """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024
+
+
+class Recorder:
+
+    def __init__(self):
+        """ Collecting the timed stages and the counters
+        of the pipelines, thread-safe as the stages also
+        run on the loading and saving threads.
+        """
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.events = []
+        self.counters = {}
+
+    def add(self, name: str, start: float, duration: float, args: dict=None):
+        event = {
+            'name': name,
+            'start': start - self._origin,
+            'duration': duration,
+            'thread': threading.get_ident(),
+            'peak_rss_mb': peak_rss_mb(),
+            'args': args or {},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def count(self, name: str, n: int=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def latest(self, name: str) -> dict:
+        """ Return the last finished event of stage `name`, None if never run """
+        with self._lock:
+            for event in reversed(self.events):
+                if event['name'] == name:
+                    return event
+        return None
+
+    def summary(self, *names: str) -> str:
+        """ One line status of the last run of the stages, e.g.
+        `split 1.20 s | save 3.41 s | peak 812 MB` """
+        parts = []
+        for name in names:
+            event = self.latest(name)
+            if event is not None:
+                parts.append(f'{name.split(".")[-1]} {event["duration"]:.2f} s')
+        peak = peak_rss_mb()
+        if parts and peak is not None:
+            parts.append(f'peak {peak:.0f} MB')
+        return ' | '.join(parts)
+
+    def to_json(self) -> dict:
+        with self._lock:
+            return {'events': list(self.events), 'counters': dict(self.counters)}
+
+    def to_chrome_trace(self) -> dict:
+        """ Chrome trace event format (chrome://tracing, Perfetto) """
+        pid = os.getpid()
+        trace = self.to_json()
+        events = [{
+            'name': e['name'], 'ph': 'X', 'pid': pid, 'tid': e['thread'],
+            'ts': e['start'] * 1e6, 'dur': e['duration'] * 1e6,
+            'args': dict(e['args'], peak_rss_mb=e['peak_rss_mb']),
+        } for e in trace['events']]
+        end = max((e['ts'] + e['dur'] for e in events), default=0)
+        events += [{'name': name, 'ph': 'C', 'pid': pid, 'ts': end, 'args': {name: value}}
+                   for name, value in trace['counters'].items()]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path):
+        """ Writing the trace, in Chrome trace
+        format if `path` ends with `.trace.json` """
+        path = Path(path)
+        chrome = path.name.endswith('.trace.json')
+        path.write_text(json.dumps(self.to_chrome_trace() if chrome else self.to_json(), indent=1))
+
+
+recorder = Recorder()
+_profiling = threading.local()
+
+
+@contextmanager
+def stage(name: str, **args):
+    """ Timing the block as the pipeline stage `name`,
+    profiled with cProfile when `PROFILE_CPROFILE` is set
+
+    # Args:
+        name (str): stage name
+        args: extra values recorded with the event
+    """
+    profiler = None
+    if cprofile_dir and not getattr(_profiling, 'active', False):
+        # only the outermost stage of a thread, profilers can't nest
+        profiler = cProfile.Profile()
+        _profiling.active = True
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            _profiling.active = False
+            Path(cprofile_dir).mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(Path(cprofile_dir).joinpath(f'{name}-{int(time.time() * 1e3)}.prof')))
+        recorder.add(name, start, duration, args)
+
+
+def timed(name: str=None):
+    """ Decorator timing every call as a stage, named
+    after the function qualified name by default """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__qualname__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int=1):
+    recorder.count(name, n)
+
+
+def summary(*names: str) -> str:
+    return recorder.summary(*names)
+
+
+if trace_path:
+    atexit.register(recorder.save, trace_path)
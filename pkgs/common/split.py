@@ -0,0 +1,88 @@
+import hashlib
+from pathlib import Path
+
+from . import config
+
+
+def hash_unit(key: str, seed: int=0) -> float:
+    """ Stable hash of `key` uniform in [0, 1), the same
+    across runs unlike the builtin (salted) `hash` """
+    digest = hashlib.blake2b(f'{seed}:{key}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2**64
+
+
+def spatial_block(y: int, x: int, block: int=None) -> str:
+    """ Name of the `config.split_block` pixels block holding the
+    tile corner (y, x), grouping the overlapping tiles of a region.
+
+    A tile straddling a block boundary belongs to the block of its
+    corner only, so it may still share pixels with the tiles of the
+    neighbouring block, which can land in the other set.
+    """
+    block = block or config.split_block
+    return f'{int(y) // block}_{int(x) // block}'
+
+
+class TrainValSplit(object):
+
+    def __init__(self, val_ratio: float, seed: int=None):
+        """ Splitting the samples into the training and validation
+        sets, reproducibly across runs and without a second pass
+        over the output directory: the samples are recorded with
+        their group (spatial block, frame) as they are written, then
+        whole groups are assigned in the order of their hash until
+        the validation ratio is reached, so the samples of a group
+        never leak across the sets.
+
+        If the groups are too few or too large to approach the ratio
+        (e.g. a single block), the samples are assigned one by one
+        in the order of their name hash instead.
+
+        # Args:
+            val_ratio (float): validation ratio
+            seed (int, optional): hash seed. Defaults to `config.split_seed`.
+        """
+        assert 0 <= val_ratio <= 1
+        self.val_ratio = val_ratio
+        self.seed = config.split_seed if seed is None else seed
+        self.names = []
+        self.groups = {}
+
+    def add(self, name: str, group: str=None):
+        """ Recording the sample `name`
+
+        # Args:
+            name (str): sample name
+            group (str, optional): samples of the same group share the set
+        """
+        self.names.append(name)
+        self.groups.setdefault(name if group is None else group, []).append(name)
+
+    def assign(self) -> tuple:
+        """ Return (training names, validation names), in writing order """
+        target = round(self.val_ratio * len(self.names))
+        val = self._take(self.groups, target)
+        if abs(len(val) - target) > target / 2:
+            val = self._take({name: [name] for name in self.names}, target)
+        return [n for n in self.names if n not in val], [n for n in self.names if n in val]
+
+    def _take(self, groups: dict, target: int) -> set:
+        """ Groups taken in hash order, skipping the ones
+        moving the validation size away from `target` """
+        val = set()
+        for key in sorted(groups, key=lambda k: hash_unit(k, self.seed)):
+            if len(val) >= target: break
+            if abs(target - len(val) - len(groups[key])) < target - len(val):
+                val.update(groups[key])
+        return val
+
+    def save(self, det_dir, trainval: bool=False):
+        """ Writing `train.txt`, `val.txt` (and `trainval.txt`) into `det_dir` """
+        det_dir = Path(det_dir)
+        det_dir.mkdir(parents=True, exist_ok=True)
+        train, val = self.assign()
+        sets = {'train': train, 'val': val}
+        if trainval:
+            sets['trainval'] = self.names
+        for name, names in sets.items():
+            det_dir.joinpath(f'{name}.txt').write_text('\n'.join(names))
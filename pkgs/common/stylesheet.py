@@ -0,0 +1,36 @@
+import threading
+from pathlib import Path
+
+
+_stylesheets = {}  # directory -> {stylesheet name: stylesheet}
+_lock = threading.Lock()
+
+
+def _read_stylesheet(path: Path) -> str:
+    lines = path.read_text().splitlines()
+    return ' '.join([line.strip() for line in lines])
+
+
+def preload_stylesheets(dir) -> dict:
+    """ Reading all the stylesheets (`.txt`) in `dir` once,
+    the later lookups are served from memory.
+
+    # Args:
+        dir (str, Path): stylesheet directory
+
+    # Returns:
+        {stylesheet name: stylesheet}
+    """
+    key = str(Path(dir))
+    with _lock:
+        if key not in _stylesheets:
+            _stylesheets[key] = {p.stem: _read_stylesheet(p) for p in Path(dir).glob('*.txt')}
+        return _stylesheets[key]
+
+
+def load_stylesheet(fn: str, dir) -> str:
+    """ Return the stylesheet `fn` in `dir`, process-wide memoized """
+    stylesheets = preload_stylesheets(dir)
+    if fn not in stylesheets:
+        raise FileExistsError(f'{fn} not exist in {str(dir)}.')
+    return stylesheets[fn]
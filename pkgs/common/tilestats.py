@@ -0,0 +1,105 @@
+import numpy as np
+from pathlib import Path
+
+from .lazy import lazy_import
+
+gdal = lazy_import('osgeo.gdal', 'gdal')
+
+
+def raster_nodata(ds) -> tuple:
+    """ No-data description of the raster
+
+    # Args:
+        ds (gdal.Dataset, str or Path): raster
+
+    # Returns:
+        (no-data value of the first band or None,
+         alpha band number (1-based) or None)
+    """
+    if isinstance(ds, (str, Path)):
+        ds = gdal.Open(str(ds))
+    alpha = None
+    for i in range(1, ds.RasterCount + 1):
+        if ds.GetRasterBand(i).GetColorInterpretation() == gdal.GCI_AlphaBand:
+            alpha = i
+    return ds.GetRasterBand(1).GetNoDataValue(), alpha
+
+
+def valid_pixels(im: np.ndarray, nodata: float=None, alpha: np.ndarray=None) -> np.ndarray:
+    """ Mask of the pixels holding data: the non-transparent ones
+    if there is an alpha band, otherwise the ones with any band
+    differing from the no-data value (0, the black border of the
+    orthophotos, by default)
+
+    # Args:
+        im (numpy.ndarray): (H, W) or (H, W, C) image
+        nodata (float, optional): no-data value
+        alpha (numpy.ndarray, optional): (H, W) alpha band
+
+    # Returns:
+        (H, W) bool numpy.ndarray
+    """
+    if alpha is not None:
+        return alpha > 0
+    nodata = 0 if nodata is None else nodata
+    if im.ndim == 2:
+        return im != nodata
+
+    valid = np.zeros(im.shape[:2], dtype=bool)
+    for band in range(im.shape[2]):
+        valid |= im[..., band] != nodata
+    return valid
+
+
+def grid_origins(height: int, width: int, size: int, stride: int) -> np.ndarray:
+    """ Top-left corners of the `size` windows sliding by `stride`,
+    in the order of `skimage.util.view_as_windows(...).reshape`
+
+    # Returns:
+        (N, 2) numpy.ndarray of (y, x)
+    """
+    ys = np.arange(0, height - size + 1, stride)
+    xs = np.arange(0, width - size + 1, stride)
+    yy, xx = np.meshgrid(ys, xs, indexing='ij')
+    return np.stack([yy.ravel(), xx.ravel()], axis=1)
+
+
+def _prefix_sums(a: np.ndarray, cuts: np.ndarray, axis: int) -> np.ndarray:
+    """ Prefix sums of `a` along `axis` at the sorted unique
+    positions `cuts` (starting with 0), summing each run
+    between two cuts once rather than every row/column """
+    starts = cuts[cuts < a.shape[axis]]
+    runs = np.add.reduceat(a, starts, axis=axis, dtype=np.int64)
+    zero = np.zeros_like(np.take(runs, [0], axis=axis))
+    return np.concatenate([zero, np.cumsum(runs, axis=axis)], axis=axis), \
+           np.append(starts, a.shape[axis])
+
+
+def window_sums(mask: np.ndarray, origins: np.ndarray, size: int) -> np.ndarray:
+    """ Sums of `mask` over all the `size` windows at once, O(1) each
+    from the integral image (summed-area table) of `mask`, which is
+    only evaluated at the window corners rows and columns, so its
+    memory doesn't grow with the raster.
+
+    # Args:
+        mask (numpy.ndarray): (H, W) bool or integer image
+        origins (numpy.ndarray): (N, 2) window corners (y, x)
+        size (int): window size
+
+    # Returns:
+        (N,) int64 numpy.ndarray
+    """
+    if not len(origins):
+        return np.zeros(0, dtype=np.int64)
+    ys, xs = origins[:, 0], origins[:, 1]
+    sat, py = _prefix_sums(mask, np.unique(np.concatenate([[0], ys, ys + size])), 0)
+    sat, px = _prefix_sums(sat, np.unique(np.concatenate([[0], xs, xs + size])), 1)
+
+    y0, y1 = np.searchsorted(py, ys), np.searchsorted(py, ys + size)
+    x0, x1 = np.searchsorted(px, xs), np.searchsorted(px, xs + size)
+    return sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+
+
+def window_fractions(mask: np.ndarray, origins: np.ndarray, size: int) -> np.ndarray:
+    """ Fraction of the non-zero `mask` pixels in each window """
+    return window_sums(mask != 0, origins, size) / size**2
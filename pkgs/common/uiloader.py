@@ -0,0 +1,113 @@
+import hashlib
+import importlib.util
+import io
+import sys
+from pathlib import Path
+from PyQt5.QtWidgets import QWidget
+
+from .lazy import lazy_import
+
+uic = lazy_import('PyQt5.uic')
+
+
+# the repository root, holding the GUI directory
+root_dir = Path(__file__).resolve().parents[2]
+compiled_dir = root_dir.joinpath('GUI', 'compiled')
+
+
+def _source_sha1(ui_path: Path) -> str:
+    return hashlib.sha1(ui_path.read_bytes()).hexdigest()
+
+
+def compile_ui(ui_path, dir=None) -> Path:
+    """ Compiling the `.ui` file into a Python module, stamped
+    with the sha1 of its source to detect the stale ones.
+
+    # Args:
+        ui_path (str, Path): `.ui` file path
+        dir (str, Path, optional): output directory. Defaults to `compiled_dir`.
+
+    # Returns:
+        compiled module path
+    """
+    ui_path = Path(ui_path)
+    dir = compiled_dir if dir is None else Path(dir)
+    dir.mkdir(parents=True, exist_ok=True)
+
+    code = io.StringIO()
+    code.write(f'SOURCE_SHA1 = {_source_sha1(ui_path)!r}\n')
+    uic.compileUi(str(ui_path), code)
+
+    # writing through a temporary file so a concurrently
+    # starting process never imports a half written module
+    module_path = dir.joinpath(f'{ui_path.stem}.py')
+    tmp_path = module_path.with_suffix('.tmp')
+    tmp_path.write_text(code.getvalue(), encoding='utf-8')
+    tmp_path.replace(module_path)
+    return module_path
+
+
+def _resolve(ui_path) -> Path:
+    """ `ui_path` relative to the working directory if it
+    exists there, to the repository root otherwise """
+    ui_path = Path(ui_path)
+    if ui_path.is_absolute() or ui_path.exists():
+        return ui_path
+    return root_dir.joinpath(ui_path)
+
+
+def _compiled_form(ui_path: Path):
+    """ Return the `Ui_*` class compiled from `ui_path`,
+    None if missing or stale. """
+    module_path = compiled_dir.joinpath(f'{ui_path.stem}.py')
+    if not module_path.exists():
+        return None
+
+    spec = importlib.util.spec_from_file_location(f'_compiled_ui_{ui_path.stem}', str(module_path))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        return None
+    if getattr(module, 'SOURCE_SHA1', None) != _source_sha1(ui_path):
+        return None
+
+    for name, value in vars(module).items():
+        if name.startswith('Ui_') and isinstance(value, type):
+            return value
+    return None
+
+
+def load_ui(ui_path, widget: QWidget):
+    """ Drop-in replacement of `PyQt5.uic.loadUi(ui_path, widget)`
+    using the precompiled module if it's up to date, falling
+    back to parsing the `.ui` file otherwise (and recompiling it
+    for the next start when the install is writable).
+
+    # Args:
+        ui_path (str, Path): `.ui` file path
+        widget (QWidget): top-level widget to be set up
+    """
+    ui_path = _resolve(ui_path)
+    form = _compiled_form(ui_path) if ui_path.exists() else None
+
+    if form is None:
+        uic.loadUi(str(ui_path), widget)
+        try:
+            compile_ui(ui_path)
+        except Exception:
+            pass
+        return
+
+    ui = form()
+    ui.setupUi(widget)
+    # loadUi exposes the child widgets as attributes of `widget`
+    for name, value in vars(ui).items():
+        setattr(widget, name, value)
+
+
+if __name__ == '__main__':
+    # build step: python -m pkgs.common.uiloader [GUI/*.ui ...]
+    paths = sys.argv[1:] or sorted(root_dir.joinpath('GUI').glob('*.ui'))
+    for path in paths:
+        print(f'{path} -> {compile_ui(path)}')
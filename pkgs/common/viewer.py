@@ -0,0 +1,121 @@
+import numpy as np
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+from PyQt5.QtWidgets import *
+
+
+class PhotoViewer(QGraphicsView):
+    """ Zoomable photo view shared by the palm, parcel and vehicle canvases.
+
+    Only the changed regions of the viewport are repainted and the
+    scene is BSP indexed, so repaint cost follows the items actually
+    touched rather than the whole scene. The photo is a pixmap item,
+    already drawn from the pixmap as is, so it isn't cached again.
+    """
+
+    zoom_factor = 1.25
+    fit_keeps_zoom = False  # fitInView scaled by the zoom level, else resetting it
+    wheel_modifier = Qt.ControlModifier  # None: zooming without modifier
+    zoom_signal = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super(PhotoViewer, self).__init__(parent)
+        self._zoom = 0
+        self._empty = True
+        self._grabbed = False
+        self._scene = QGraphicsScene(self)
+        self._scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+        self._photo = QGraphicsPixmapItem()
+        # hit-testing the bounding rect instead of the pixmap mask
+        self._photo.setShapeMode(QGraphicsPixmapItem.BoundingRectShape)
+        self._scene.addItem(self._photo)
+
+        self.setScene(self._scene)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFrameShape(QFrame.NoFrame)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        # the items paint() don't restore the painter state themselves,
+        # so it must not be shared between the items (no DontSavePainterState)
+        self.setOptimizationFlags(QGraphicsView.DontAdjustForAntialiasing)
+
+    def hasPhoto(self):
+        return not self._empty
+
+    def fitInView(self):
+        """ Fitting the photo into the view, scaled by the current
+        zoom level if `fit_keeps_zoom`, otherwise back to level 0 """
+        rect = QRectF(self._photo.pixmap().rect())
+        if not rect.isNull():
+            self.setSceneRect(rect)
+            if self.hasPhoto():
+                unity = self.transform().mapRect(QRectF(0, 0, 1, 1))
+                self.scale(1 / unity.width(), 1 / unity.height())
+                viewrect = self.geometry()
+                viewrect.setRect(0, 0, viewrect.width(), viewrect.height())
+                scenerect = self.transform().mapRect(rect)
+                factor = max(viewrect.width() / scenerect.width(),
+                             viewrect.height() / scenerect.height())
+                if self.fit_keeps_zoom:
+                    factor *= self.__class__.zoom_factor**self._zoom
+                self.scale(factor, factor)
+            if not self.fit_keeps_zoom:
+                self._zoom = 0
+
+    def setPhoto(self, back_im: np.ndarray=None):
+        """ Showing the image array (gray, RGB or ARGB), None for clearing """
+        if back_im is None:
+            self.setPixmap(QPixmap())
+            return
+
+        height, width = back_im.shape[:2]
+        chnum = 1 if back_im.ndim == 2 else back_im.shape[2]
+        imgFormat = {1: QImage.Format_Grayscale8, 4: QImage.Format_ARGB32}.get(chnum, QImage.Format_RGB888)
+        qImg = QImage(back_im.data, width, height, back_im.strides[0], imgFormat)
+        self.setPixmap(QPixmap.fromImage(qImg))
+
+    def setPixmap(self, pixmap: QPixmap):
+        self._zoom = 0
+        if pixmap and not pixmap.isNull():
+            self._empty = False
+            self.setDragMode(QGraphicsView.ScrollHandDrag)
+            self._photo.setPixmap(pixmap)
+        else:
+            self._empty = True
+            self.setDragMode(QGraphicsView.NoDrag)
+            self._photo.setPixmap(QPixmap())
+        self.fitInView()
+
+    def zoom_in(self):
+        if self.hasPhoto():
+            factor = self.__class__.zoom_factor
+            self._zoom += 1
+            self.scale(factor, factor)
+
+    def zoom_out(self):
+        if self.hasPhoto():
+            factor = 1 / self.__class__.zoom_factor
+            self._zoom -= 1
+            if self._zoom > 0:
+                self.scale(factor, factor)
+            else:
+                self._zoom = 0
+                self.fitInView()
+
+    def get_zoom_factor(self):
+        return self._zoom
+
+    def wheelEvent(self, event):
+        numDegrees = event.angleDelta() / 8
+        numSteps = (numDegrees / 15).y()
+
+        modifier = self.__class__.wheel_modifier
+        if self.hasPhoto() and (modifier is None or event.modifiers() == modifier):
+            if numSteps > 0:
+                self.zoom_in()
+                self.zoom_signal.emit()
+            elif numSteps < 0 and (self._zoom != 0 or not self.fit_keeps_zoom):
+                self.zoom_out()
+                self.zoom_signal.emit()
@@ -5,8 +5,8 @@ from decouple import config
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from scipy.spatial.distance import cdist
 
+from ...common.viewer import PhotoViewer
 from .circle import PosCircleItem
 from .rect_handle import RectItemHandle
 from ..utils.qtutils import dist_pts, qpointf_to_list
@@ -18,99 +18,12 @@ func_mode = {
 }
 
 
-class PhotoViewer(QGraphicsView):
-
-    zoom_factor = 1.25
-    zoom_signal = pyqtSignal()
-
-    def __init__(self, parent=None):
-        super(PhotoViewer, self).__init__(parent)
-        self._zoom = 0
-        self._empty = True
-        self._grabbed = False
-        self._scene = QGraphicsScene(self)
-        self._photo = QGraphicsPixmapItem()
-        self._scene.addItem(self._photo)
-        
-        self.setScene(self._scene)
-        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
-        self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.setFrameShape(QFrame.NoFrame)
-
-    def hasPhoto(self):
-        return not self._empty
-
-    def fitInView(self):
-        rect = QRectF(self._photo.pixmap().rect())
-        if not rect.isNull():
-            self.setSceneRect(rect)
-            if self.hasPhoto():
-                unity = self.transform().mapRect(QRectF(0, 0, 1, 1))
-                self.scale(1 / unity.width(), 1 / unity.height())
-                viewrect = self.geometry()
-                viewrect.setRect(0, 0, viewrect.width(), viewrect.height())
-                scenerect = self.transform().mapRect(rect)
-                factor = max(viewrect.width() / scenerect.width(),
-                             viewrect.height() / scenerect.height())
-                factor *= self.__class__.zoom_factor**self._zoom
-                self.scale(factor, factor)
-
-    def setPhoto(self, back_im: np.ndarray=None):
-        height, width, chnum = back_im.shape
-        bytesPerLine = width * chnum
-        imgFormat = QImage.Format_ARGB32 if chnum == 4 else QImage.Format_RGB888
-        qImg = QImage(back_im.data, width, height, bytesPerLine, imgFormat)
-        pixmap = QPixmap(qImg)
-
-        self._zoom = 0
-        if pixmap and not pixmap.isNull():
-            self._empty = False
-            self.setDragMode(QGraphicsView.ScrollHandDrag)
-            self._photo.setPixmap(pixmap)
-        else:
-            self._empty = True
-            self.setDragMode(QGraphicsView.NoDrag)
-            self._photo.setPixmap(QPixmap())
-        self.fitInView()
-
-    def zoom_in(self):
-        if self.hasPhoto():
-            factor = self.__class__.zoom_factor
-            self._zoom += 1
-            self.scale(factor, factor)
-
-    def zoom_out(self):
-        if self.hasPhoto():
-            factor = 1 / self.__class__.zoom_factor
-            self._zoom -= 1
-            if self._zoom > 0:
-                self.scale(factor, factor)
-            else:
-                self._zoom = 0 
-                self.fitInView()
-
-    def get_zoom_factor(self):
-        return self._zoom
-
-    def wheelEvent(self, event):
-        numDegrees = event.angleDelta() / 8
-        numSteps = (numDegrees / 15).y()
-        
-        if self.hasPhoto():
-            if numSteps > 0:
-                self.zoom_in()
-                self.zoom_signal.emit()
-            elif numSteps < 0 and self._zoom != 0:
-                self.zoom_out()
-                self.zoom_signal.emit()
-            
-
 class PalmPositionCanvas(PhotoViewer):
 
     add_win_signal = pyqtSignal(QPointF)
     add_pos_signal = pyqtSignal()
+    wheel_modifier = None
+    fit_keeps_zoom = True
 
     def __init__(self, parent, geometry: QRect):
         super(PalmPositionCanvas, self).__init__(parent)
@@ -28,6 +28,7 @@ class RectItemHandle(QGraphicsRectItem):
     selectedColor = (224, 24, 24)
     minCreateSize = 10
     minSize = None
+    fillLod = 0.05  # least level of detail the rect is filled at
 
     handleTopLeft = 1
     handleTopRight = 2
@@ -190,7 +191,8 @@ class RectItemHandle(QGraphicsRectItem):
         """
         Paint the node in the graphic view.
         """
-        painter.setBrush(QBrush(QColor(*self.color, 50)))
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        painter.setBrush(QBrush(QColor(*self.color, 50)) if lod >= self.fillLod else Qt.NoBrush)
         painter.setPen(QPen(QColor(*self.color, 200), self.edge_width, style=Qt.SolidLine, cap=Qt.RoundCap, join=Qt.RoundJoin))
         painter.drawRect(self.originRect())
 
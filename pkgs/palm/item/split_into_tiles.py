@@ -1,17 +1,31 @@
-import cv2
-import gdal
 import numpy as np
 import shutil
-import random
 from typing import Union
 from tqdm import tqdm
 from pathlib import Path
-from skimage.util.shape import view_as_windows
+
+from ...common import config
+from ...common.export import open_writer
+from ...common.lazy import lazy_import
+from ...common.profiling import timed, count
+from ...common.split import TrainValSplit, spatial_block
+from ...common.tilestats import raster_nodata, valid_pixels, grid_origins, window_fractions
+
+cv2 = lazy_import('cv2')
+gdal = lazy_import('osgeo.gdal', 'gdal')
+shape = lazy_import('skimage.util.shape')
 
 
 class DatasetProducing(object):
 
-    def __init__(self, raster: gdal.Dataset, 
+    # sample field -> Pascal VOC directory
+    layout = {
+        'image.png': 'JPEGImages',
+        'label.png': 'SegmentationClass',
+        'visual.png': 'VisualImages',
+    }
+
+    def __init__(self, raster: 'gdal.Dataset', 
                        pos: np.ndarray,
                        reso: float, 
                        n_class: int=None, 
@@ -38,6 +52,7 @@ class DatasetProducing(object):
         self.lb_color = np.random.randint(256, size=(self.n_class, 3))
         self.alpha = alpha
 
+    @timed()
     def split(self, size: int, ratio: float, filter: tuple=None, windows: np.ndarray=None):
         """Splitting the images into blocks
 
@@ -51,29 +66,27 @@ class DatasetProducing(object):
 
         assert size <= height and size <= width
         assert 0 <= ratio < 1
-
-        self.im_tiles = np.empty((0, size, size, 3), dtype=np.uint8)
-        self.lb_tiles = np.empty((0, size, size), dtype=np.uint8)
+        assert filter is None or len(filter) == 2
 
         if len(windows):
+            im_tiles = [np.empty((0, size, size, 3), dtype=np.uint8)]
+            lb_tiles = [np.empty((0, size, size), dtype=np.uint8)]
+            origins = [np.empty((0, 2), dtype=int)]
             for win in windows:
                 coords = self._win_size_trim(win, width, height)
                 im, lb = self._label_image_generate(coords)
-                _im = view_as_windows(im, (size, size, 3), stride)
-                self.im_tiles = np.concatenate((self.im_tiles, _im.reshape(-1, *(size, size, 3))))
-                _lb = view_as_windows(lb, (size, size), stride)
-                self.lb_tiles = np.concatenate((self.lb_tiles, _lb.reshape(-1, *(size, size))))
+                _im, _lb, _origins = self._tiles_with_data(im, lb, size, stride, filter, coords)
+                im_tiles.append(_im)
+                lb_tiles.append(_lb)
+                origins.append(_origins)
+            self.im_tiles = np.concatenate(im_tiles)
+            self.lb_tiles = np.concatenate(lb_tiles)
+            self.origins = np.concatenate(origins)
         else:
             im, lb = self._label_image_generate()
-            self.im_tiles = view_as_windows(im, (size, size, 3), stride)
-            self.im_tiles = self.im_tiles.reshape(-1, *(size, size, 3))
-            self.lb_tiles = view_as_windows(lb, (size, size), stride)
-            self.lb_tiles = self.lb_tiles.reshape(-1, *(size, size))
-
-        if filter is not None:
-            assert len(filter) == 2
-            self._filter_by_coverage(filter)
+            self.im_tiles, self.lb_tiles, self.origins = self._tiles_with_data(im, lb, size, stride, filter)
 
+    @timed()
     def save(self, split_ratio: float=0.8, filename: str='', save_dir: Union[str, Path]=''):
         assert isinstance(save_dir, (str, Path)) or save_dir is None
         assert 0.5 <= split_ratio <= 1, "Split Ratio must in rnage [0.5, 1]."
@@ -82,62 +95,70 @@ class DatasetProducing(object):
         self.save_dir = self.save_dir.joinpath('PascalVOC')
         if self.save_dir.exists(): shutil.rmtree(str(self.save_dir))
 
-        self.save_dir.joinpath('JPEGImages').mkdir(parents=True)
-        self.save_dir.joinpath('SegmentationClass').mkdir(parents=True)
-        self.save_dir.joinpath('VisualImages').mkdir(parents=True)
-
-        idx, fns = 0, []
-        with tqdm(total=len(self.im_tiles)) as pbar:
-            for im, lb in zip(self.im_tiles, self.lb_tiles):
-                if np.max(im) == 0: continue
+        idx = 0
+        # the tiles of a block share the set
+        splitter = TrainValSplit(1 - split_ratio)
+        writer = open_writer(self.save_dir, self.layout)
+        with writer, tqdm(total=len(self.im_tiles)) as pbar:
+            for im, lb, (y, x) in zip(self.im_tiles, self.lb_tiles, self.origins):
                 vs = self._label_visualization(im, lb)
-                fns.append(f'{filename}_{idx}')
-                cv2.imwrite(str(self.save_dir.joinpath('JPEGImages', f'{fns[-1]}.png')), im)
-                cv2.imwrite(str(self.save_dir.joinpath('SegmentationClass', f'{fns[-1]}.png')), lb)
-                cv2.imwrite(str(self.save_dir.joinpath('VisualImages', f'{fns[-1]}.png')), vs)
+                fn = f'{filename}_{idx}'
+                writer.write(fn, {'image.png': im, 'label.png': lb, 'visual.png': vs})
+                splitter.add(writer.sample_key(fn), spatial_block(y, x))
                 idx += 1
                 pbar.update(1)
+        count('palm.tiles_written', idx)
 
-        self.save_train_val(fns, split_ratio)
+        splitter.save(self.save_dir.joinpath('ImageSets/Segmentation'))
 
-    def save_train_val(self, fns: list, ratio: float):
-        """ Splitting the training and validation
-        data through image name by specified ratio
+    def _tiles_with_data(self, im, lb, size: int, stride: int,
+                         filter: tuple=None, coords: tuple=None):
+        """ Tiles of the region, the ones whose no-data fraction
+        reaches `config.max_nodata_ratio` or whose coverage is out
+        of the `filter` bounds are dropped before being copied
+        out of the region
 
-        # Args:
-            fns (list): filenames
-            ratio (float): train and validation split ratio
+        # Returns:
+            (image tiles, label tiles, (N, 2) tile corners (y, x) in the raster)
+        """
+        im_view = shape.view_as_windows(im, (size, size, 3), stride)[:, :, 0]
+        lb_view = shape.view_as_windows(lb, (size, size), stride)
+
+        origins = grid_origins(lb.shape[0], lb.shape[1], size, stride)
+        nodata = window_fractions(~self._valid_pixels(im, coords), origins, size)
+        keep = nodata < config.max_nodata_ratio
+        if filter is not None:
+            keep &= self._filter_by_coverage(lb, origins, size, filter)
+
+        offset = (0, 0) if coords is None else (int(coords[1]), int(coords[0]))
+        grid_keep = keep.reshape(lb_view.shape[:2])
+        return im_view[grid_keep], lb_view[grid_keep], origins[keep] + offset
+
+    def _valid_pixels(self, im, coords: tuple=None):
+        """ Pixels of the region holding data, from the
+        alpha band or the no-data value of the raster """
+        nodata, alpha = raster_nodata(self.ds)
+        if alpha is None:
+            return valid_pixels(im, nodata)
+
+        x1, y1, x2, y2 = (0, 0, self.ds.RasterXSize, self.ds.RasterYSize) \
+            if coords is None else list(map(int, coords))
+        return valid_pixels(im, alpha=self.ds.GetRasterBand(alpha).ReadAsArray(x1, y1, x2-x1, y2-y1))
+
+    def _filter_by_coverage(self, lb, origins: np.ndarray, size: int, filter: tuple):
+        """ Filter the windows by the label coverage, computed
+        from the summed-area table of the region label, so
+        the pixels shared by overlapping windows are only
+        counted once
+
+        # Returns:
+            bool numpy.ndarray, True for the windows to keep
         """
-        det_dir = self.save_dir.joinpath('ImageSets/Segmentation')
-        det_dir.mkdir(parents=True)
-
-        train_num = int(len(fns) * ratio)
-        random.shuffle(fns)
-        with open(str(det_dir.joinpath('train.txt')), 'w') as file:
-            file.writelines('\n'.join(fns[:train_num]))
-        with open(str(det_dir.joinpath('val.txt')), 'w') as file:
-            file.writelines('\n'.join(fns[train_num:]))
-
-    def _filter_by_coverage(self, filter: tuple):
-        """ Filter the mask by coverage """
         l_b, u_b = filter
         assert 0 <= l_b < u_b <= 1
 
-        def coverage_ratio(mask):
-            if np.max(mask) == 0: return 0
-            area = mask.shape[0] * mask.shape[1]
-            return np.count_nonzero(mask)/area
-
-        new_im_tiles = []
-        new_lb_tiles = []
-
-        for im, lb in zip(self.im_tiles, self.lb_tiles):
-            if l_b <= coverage_ratio(lb) <= u_b:
-                new_im_tiles.append(im)
-                new_lb_tiles.append(lb)
-
-        self.im_tiles = np.array(new_im_tiles).astype('uint8')
-        self.lb_tiles = np.array(new_lb_tiles).astype('uint8')
+        coverage = window_fractions(lb, origins, size)
+        return (l_b <= coverage) & (coverage <= u_b)
 
     def _label_visualization(self, im, lb):
         vs = np.zeros_like(im)
@@ -1,22 +1,24 @@
 import os
 os.environ["OPENCV_IO_MAX_IMAGE_PIXELS"] = pow(2, 40).__str__()
 
-import cv2
 import numpy as np
-import pandas as pd
 from decouple import config
 from pathlib import Path
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from PyQt5.uic import loadUi
-from scipy import spatial
 from screeninfo import get_monitors
 
+from ..common.lazy import lazy_import
+from ..common.profiling import summary
+from ..common.uiloader import load_ui
 from .dialog import warning_msg, critical_msg
 from .utils.imutils import load_image
 from .item import PalmPositionCanvas, RectItemHandle, DatasetProducing
-from .style.stylesheet import connect_to_stylesheet
+from .style.stylesheet import connect_to_stylesheet, preload_stylesheets
+
+pd = lazy_import('pandas')
+spatial = lazy_import('scipy.spatial')
 
 
 palm_radius = 1.5 # unit: meter
@@ -30,7 +32,8 @@ class palmGUI(QDialog):
 
     def __init__(self, parent=None):
         super(palmGUI, self).__init__(parent)
-        loadUi('GUI/dialog_palm.ui', self)
+        load_ui('GUI/dialog_palm.ui', self)
+        preload_stylesheets('GUI/palm')
         self.setWindowIcon(QIcon('GUIImg/palm-tree.png'))
         self.full_screen = False
         self.org_screen_sz = None
@@ -38,7 +41,6 @@ class palmGUI(QDialog):
 
         # canvas initialization
         self.view_canvas = PalmPositionCanvas(self, QRect(0, 0, 10, 10))
-        self.view_canvas.setViewportUpdateMode(0)
         self.gl_canvas.addWidget(self.view_canvas)
         
         # push buttons setting
@@ -125,7 +127,7 @@ class palmGUI(QDialog):
         self.pb_save_csv.setEnabled(True)
         self.le_crop_size.setEnabled(False)
         self.le_overlap_ratio.setEnabled(False)
-        self.info_display.setText('Image Loaded.')
+        self.info_display.setText(f"Image Loaded. {summary('load_image')}")
     
     def mode_switch(self, mode: str):
         """ Mode switching and changing
@@ -354,7 +356,8 @@ class palmGUI(QDialog):
 
         ds.split(size, ratio, windows=windows)
         ds.save(filename=self._filename, save_dir=self._im_dir)
-        self.info_display.setText("Dataset Completed !")
+        self.info_display.setText('Dataset Completed ! ' +
+            summary('DatasetProducing.split', 'DatasetProducing.save'))
 
     def check_win_size(self):
         """ Delete the trivial crop windows. """
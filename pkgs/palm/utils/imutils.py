@@ -1,16 +1,16 @@
-import cv2
 import numpy as np
 from typing import Tuple
 
-try:
-    from osgeo import gdal
-    from osgeo import gdalconst
-except ImportError:
-    import gdal
-    import gdalconst
+from ...common.lazy import lazy_import
+from ...common.profiling import timed
 
+cv2 = lazy_import('cv2')
+gdal = lazy_import('osgeo.gdal', 'gdal')
+gdalconst = lazy_import('osgeo.gdalconst', 'gdalconst')
 
-def load_image(im_path: str, pixel_size: float) -> Tuple[gdal.Dataset, np.ndarray, float, tuple]:
+
+@timed('load_image')
+def load_image(im_path: str, pixel_size: float) -> Tuple['gdal.Dataset', np.ndarray, float, tuple]:
     raster = gdal.Open(str(im_path))
     trans = raster.GetGeoTransform()
     raster = _pixel_sz_trans(raster, pixel_size)
@@ -29,7 +29,8 @@ def load_image(im_path: str, pixel_size: float) -> Tuple[gdal.Dataset, np.ndarra
     return raster, im, im_factor, trans
 
 
-def _pixel_sz_trans(ds: gdal.Dataset, ps: float) -> gdal.Dataset:
+@timed('_pixel_sz_trans')
+def _pixel_sz_trans(ds: 'gdal.Dataset', ps: float) -> 'gdal.Dataset':
     """ Resize the image by pixel size. """
 
     ds_trans = ds.GetGeoTransform()
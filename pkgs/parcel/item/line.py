@@ -10,6 +10,12 @@ class DeleteSignal(QObject):
         self.signal.emit(obj)
 
 
+class MouseReleaseSignal(QObject):
+    signal = pyqtSignal(QGraphicsLineItem)
+    def emit_signal(self, obj):
+        self.signal.emit(obj)
+
+
 class LineHandleItem(QGraphicsLineItem):
 
     color = (196, 51, 51)
@@ -30,6 +36,7 @@ class LineHandleItem(QGraphicsLineItem):
         self.creating = False
         self.mousePressPos = None
         self.item_delete_signal = DeleteSignal()
+        self.mouse_release_signal = MouseReleaseSignal()
         self._opacity = 0
 
         self.setAcceptHoverEvents(True)
@@ -81,10 +88,13 @@ class LineHandleItem(QGraphicsLineItem):
         if self._width() == 0 and self._height() == 0 and self.creating:
             self.item_delete_signal.emit_signal(self)
         else:
+            # only a newly drawn line is signaled, not the endpoint edits
+            created, self.creating = self.creating, False
             self.handleSelected = None
             self.mousePressPos = None
-            self.creating = False
             self.update()
+            if created:
+                self.mouse_release_signal.emit_signal(self)
         super().mouseReleaseEvent(mouseEvent)
 
 
@@ -1,15 +1,28 @@
-import math
+import numpy as np
+from typing import TYPE_CHECKING
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from shapely.geometry.polygon import Polygon
+
+from ...common.lazy import lazy_import
+from ..utils.geomutil import geo_to_image, image_to_geo, simplify_coords, simplify_tolerances
+
+if TYPE_CHECKING:
+    from shapely.geometry.polygon import Polygon
+
+geometry = lazy_import('shapely.geometry')
 
 
 class PolyItemHandle(QGraphicsPolygonItem):
 
     selectedColor = (196, 51, 51)
 
-    def __init__(self, poly: Polygon, tfw: tuple, factor: float, color: tuple, handleSize: int=20):
+    # level of detail (device pixels per scene unit) thresholds
+    handleLod = 1.0     # vertex handles and antialiasing
+    fillLod = 0.1       # polygon filling
+    minPaintSize = 3    # px, smaller polygons are painted as a dot
+
+    def __init__(self, poly: 'Polygon', tfw: tuple, factor: float, color: tuple, handleSize: int=20):
         """ initialize the handle polygon item
 
         # Args:
@@ -20,8 +33,8 @@ class PolyItemHandle(QGraphicsPolygonItem):
         """
         super().__init__()
 
-        # handle
-        self.handles = []
+        # handle, (N, 2) array of the handle top-left corners
+        self.handles = np.empty((0, 2))
         self.handleSize = handleSize
         self.handleSpace = -1 * (handleSize // 2)
         self.handleSelected = None
@@ -32,8 +45,14 @@ class PolyItemHandle(QGraphicsPolygonItem):
         self.color = color
         self.orn_poly = poly
         self.gis_coords = list(poly.exterior.coords)
+        self.edited = False  # gis_coords outdated by a vertex drag
+        self.tfw = tfw
+        self.factor = factor
         
         self.qt_polygon = self._coords_setting(tfw, factor)
+        self._levels = {}    # {tolerance: simplified coords}
+        self._outlines = {}  # {tolerance: QPolygonF}
+        self._geometry = None
         self.setPolygon(self.qt_polygon)
 
         self.setAcceptHoverEvents(True)
@@ -50,41 +69,63 @@ class PolyItemHandle(QGraphicsPolygonItem):
             tfw (tuple): geographic information
             factor (int): resize factor
         """
-        qt_polygon = QPolygonF()
-        self.img_coords = []
-        for px, py in self.gis_coords:
-            px = int((px - tfw[0]) / tfw[1] * factor) 
-            py = int((py - tfw[3]) / tfw[5] * factor)
-            qt_polygon.append(QPointF(px, py))
-            self.img_coords.append((px, py))
-        return qt_polygon
+        self.img_coords = geo_to_image(self.gis_coords, tfw, factor).astype(np.float64)
+        return QPolygonF([QPointF(x, y) for x, y in self.img_coords])
+
+
+    @classmethod
+    def from_image_coords(cls, coords, tfw: tuple, factor: float, color: tuple, handleSize: int=20):
+        """ Creating the item from image coordinates,
+        e.g. the pieces of a cut polygon, whose `gis_coords`
+        are converted from the exact (unrounded) `coords`
+
+        # Args:
+            coords (array-like): (N, 2) image coordinates
+            tfw (tuple): geographic information
+            factor (float): resize factor
+            color (tuple): polygon painting color
+        """
+        poly = geometry.Polygon(image_to_geo(coords, tfw, factor))
+        return cls(poly, tfw, factor, color, handleSize)
+
+
+    def geometry(self) -> 'Polygon':
+        """ Return the shapely polygon of the current image coordinates """
+        if self._geometry is None:
+            self._geometry = geometry.Polygon(self.img_coords)
+        return self._geometry
 
 
     def handleAt(self, point):
         """
         Returns the resize handle below the given point.
         """
-        index, candidate, min_dis = None, None, None
-        for i, handle in enumerate(self.handles):
-            if handle.contains(point):
-                d = point - handle.center()
-                l = math.sqrt(d.x()**2 + d.y()**2)
-                if candidate is None or l < min_dis:
-                    candidate = handle
-                    index = i
-                    min_dis = l
-
-        if candidate is not None:
-            return (index, candidate)
-        return None
-        
-
-    def updateHandlesPos(self):
         s = self.handleSize
+        d = np.array([point.x(), point.y()]) - self.handles
+        inside = np.all((d >= 0) & (d <= s), axis=1)
+        if not inside.any():
+            return None
+
+        # the nearest handle center among the ones containing the point
+        d -= s / 2
+        dist = np.einsum('ij,ij->i', d, d)
+        dist[~inside] = np.inf
+        index = int(np.argmin(dist))
+        return (index, self.handleRect(index))
+
+
+    def handleRect(self, index: int) -> QRectF:
+        x, y = self.handles[index]
+        return QRectF(x, y, self.handleSize, self.handleSize)
+
+
+    def updateHandlesPos(self, index: int=None):
+        """ Updating the handle of vertex `index`, all of them if None """
         o = self.handleSize + self.handleSpace
-        self.handles = []
-        for px, py in self.img_coords:
-            self.handles.append(QRectF(px-o, py-o, s, s))
+        if index is None:
+            self.handles = self.img_coords - o
+        else:
+            self.handles[index] = self.img_coords[index] - o
 
 
     def hoverMoveEvent(self, moveEvent):
@@ -140,30 +181,77 @@ class PolyItemHandle(QGraphicsPolygonItem):
             toX = fromX + mousePos.x() - self.mousePressPos.x()
             toY = fromY + mousePos.y() - self.mousePressPos.y()
             self.mousePressPos = mousePos
-            self.img_coords[index] = [toX, toY]
-            self.qt_polygon[index] = QPointF(toX, toY)
+            # the first and last vertices of the closed ring are the same one
+            last = len(self.img_coords) - 1
+            for i in ((0, last) if index in (0, last) else (index,)):
+                self.img_coords[i] = [toX, toY]
+                self.qt_polygon[i] = QPointF(toX, toY)
+                self.updateHandlesPos(i)
+            self.edited = True
             self.setPolygon(self.qt_polygon)
+            self._levels.clear()
+            self._outlines.clear()
+            self._geometry = None
+
+
+    def set_levels(self, levels: dict):
+        """ Setting the Douglas-Peucker simplified outlines
+        precomputed for the layer by `simplify_layer` """
+        self._levels = levels
+        self._outlines.clear()
 
-        self.updateHandlesPos()
+
+    def outline(self, lod: float) -> QPolygonF:
+        """ Return the coarsest simplified outline whose
+        tolerance stays within one device pixel, the
+        full resolution polygon when zoomed in enough.
+
+        # Args:
+            lod (float): level of detail of the painter transform
+        """
+        tols = [t for t in simplify_tolerances if t * lod <= 1]
+        if not tols:
+            return self.qt_polygon
+
+        tol = tols[-1]
+        if tol not in self._outlines:
+            if tol not in self._levels:
+                self._levels[tol] = simplify_coords(self.geometry(), tol)
+            coords = self._levels[tol]
+            if coords is None:  # collapsed, painted as a dot anyway
+                return self.qt_polygon
+            self._outlines[tol] = QPolygonF([QPointF(px, py) for px, py in coords])
+        return self._outlines[tol]
 
 
     def paint(self, painter, option, widget=None):
         """
         Paint the node in the graphic view.
         """
-        # drawing the bounding box rect
-        # (1, 254, 129)
-        painter.setBrush(QBrush(QColor(*self.color, 120), style = Qt.SolidPattern))
-        painter.setPen(QPen(QColor(*self.color), 1.5, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-        painter.drawConvexPolygon(self.qt_polygon)
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        rect = self.boundingRect()
+        if max(rect.width(), rect.height()) * lod < self.__class__.minPaintSize:
+            painter.setPen(QPen(QColor(*self.color), 0))
+            painter.drawPoint(rect.center())
+            return
+
+        # drawing the polygon, with cosmetic pen once thinner than a pixel
+        if lod >= self.__class__.fillLod:
+            painter.setBrush(QBrush(QColor(*self.color, 120), style = Qt.SolidPattern))
+        else:
+            painter.setBrush(Qt.NoBrush)
+        width = 1.5 if 1.5 * lod >= 1 else 0
+        painter.setPen(QPen(QColor(*self.color), width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+        painter.drawConvexPolygon(self.outline(lod))
 
-        # drawing the circle handles
+        if lod < self.__class__.handleLod:
+            return
+
+        # drawing the circle handles as round points in one call
+        r = 1  # drawed circle radius
         painter.setRenderHint(QPainter.Antialiasing)
-        painter.setBrush(QBrush(QColor(*self.color, 255)))
-        painter.setPen(QPen(QColor(*self.color, 255), 1, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-        
-        for index, handle in enumerate(self.handles):
-            if self.handleSelected is None or index == self.handleSelected[0]:
-                r = 1  # drawed circle radius
-                cp = handle.center()
-                painter.drawEllipse(QRectF(cp.x()-r, cp.y()-r, 2*r, 2*r))
+        painter.setPen(QPen(QColor(*self.color, 255), 2*r + 1, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
+        if self.handleSelected is None:
+            painter.drawPoints(self.qt_polygon)
+        else:
+            painter.drawPoint(self.handleRect(self.handleSelected[0]).center())
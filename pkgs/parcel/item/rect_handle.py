@@ -29,6 +29,8 @@ class RectItemHandle(QGraphicsRectItem):
         handleBottomRight: Qt.SizeFDiagCursor,
     }
 
+    handleLod = 0.5  # least level of detail the handles are drawn at
+
     def __init__(self, x, y, width, height, handleSize=10):
         """
         Initialize the shape.
@@ -245,6 +247,8 @@ class RectItemHandle(QGraphicsRectItem):
         painter.drawRect(self.originRect())
 
         # drawing the circle handles
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < self.handleLod:
+            return
         painter.setRenderHint(QPainter.Antialiasing)
         painter.setBrush(QBrush(QColor(255, 255, 255, 0)))
         painter.setPen(QPen(QColor(255, 255, 255, 0), eSize, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
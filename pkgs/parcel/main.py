@@ -3,22 +3,31 @@ os.environ["OPENCV_IO_MAX_IMAGE_PIXELS"] = pow(2, 40).__str__()
 
 import shutil
 import re
-import cv2
 import numpy as np
-import random
 from pathlib import Path
-from PIL import Image, ImageDraw
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from PyQt5.uic import loadUi
 
+from ..common import config
+from ..common.export import open_writer
+from ..common.lazy import lazy_import
+from ..common.profiling import timed, summary
+from ..common.split import TrainValSplit, spatial_block
+from ..common.tilestats import raster_nodata, valid_pixels, window_fractions
+from ..common.uiloader import load_ui
 from .dialog import warning_msg, replace_shpfile_msgbox
 from .item import ParcelCanvas, PolyItemHandle, RectItemHandle, LabelFrame, LineHandleItem
 from .utils.visualization import color_generate 
-from .utils.shputil import shppoly_extract, rgnshp_generate
-from .utils.imutils import resize_image, crop_im_into_tiles
-from .style.stylesheet import connect_to_stylesheet
+from .utils.shputil import shppoly_extract, rgnshp_generate, polygons_save, raster_srs
+from .utils.geomutil import PolygonIndex, split_polygons, simplify_layer, polygons_to_geo
+from .utils.imutils import resize_image, tile_origins
+from .style.stylesheet import connect_to_stylesheet, preload_stylesheets
+
+cv2 = lazy_import('cv2')
+Image = lazy_import('PIL.Image')
+ImageDraw = lazy_import('PIL.ImageDraw')
+geometry = lazy_import('shapely.geometry')
 
 
 pixel_size = 0.25  # default resolution
@@ -54,11 +63,11 @@ class SaveWorker(QObject):
 class parcelGUI(QDialog):
     def __init__(self, parent=None):
         super(parcelGUI, self).__init__(parent)
-        loadUi('GUI/dialog_parcel.ui', self)
+        load_ui('GUI/dialog_parcel.ui', self)
+        preload_stylesheets('GUI/parcel')
 
         # canvas initialization
         self.view_canvas = ParcelCanvas(self, QRect(0, 0, 10, 10))
-        self.view_canvas.setViewportUpdateMode(0)
         self.gl_canvas.addWidget(self.view_canvas)
         
         # widgets setting
@@ -105,6 +114,13 @@ class parcelGUI(QDialog):
                 self.pb_cut_mode.setStyleSheet(connect_to_stylesheet('button_selected', ssdir))
             self.view_canvas.mode = func_mode[mode]
             self.set_poly_changable()
+            if mode == 'cut':
+                # polygons may have been edited in poly mode
+                self._poly_index.reset(self._all_polygon_items())
+            if mode == 'crop':
+                self.pb_save.setEnabled(len(self.view_canvas.crop_win) > 0)
+            else:
+                self.pb_save.setEnabled(bool(self.polyitems))
 
 
     def show_label_window(self):
@@ -173,12 +189,16 @@ class parcelGUI(QDialog):
                 poly = PolyItemHandle(poly, self._tfw, self._factor, color)
                 self.view_canvas.add_item_to_scene(poly)
                 polys.append(poly)
+            # display levels of the whole layer in one pass
+            for poly, levels in zip(polys, simplify_layer([p.geometry() for p in polys])):
+                poly.set_levels(levels)
             self.polyitems.append(polys)
+        self._poly_index.reset(self._all_polygon_items())
 
         self._ratio_changed('split')
         self._ratio_changed('overlap')
         self.le_wsize.setEnabled(True)
-        self.le_crop_info.setText('Shapefile Polygons Loaded.')
+        self.le_crop_info.setText(f"Shapefile Polygons Loaded. {summary('shppoly_extract')}")
         self.hs_split_ratio.setEnabled(True)
         self.hs_overlap_ratio.setEnabled(True)
 
@@ -194,6 +214,7 @@ class parcelGUI(QDialog):
             item = LineHandleItem(mousePos, mousePos)
             self.view_canvas.add_item_to_scene(item)
             item.item_delete_signal.signal.connect(self.delete_item_by_signal)
+            item.mouse_release_signal.signal.connect(self.cut_polygons_by_line)
 
 
     def delete_item_by_click(self):
@@ -214,6 +235,38 @@ class parcelGUI(QDialog):
         elif self.view_canvas.mode == func_mode['cut']:
             self.view_canvas.delete_item_from_scene(it)
 
+
+    def cut_polygons_by_line(self, it):
+        """ ======= CUT MODE =======
+        Splitting every polygon crossed by the drawn
+        line into pieces, then removing the line, which
+        is kept if it doesn't cut any polygon
+        """
+        p1, p2 = (it.mapToScene(pt) for pt in it.points)
+        line = geometry.LineString([(p1.x(), p1.y()), (p2.x(), p2.y())])
+
+        cuts = split_polygons(self._poly_index, line)
+        if not cuts:
+            self.le_crop_info.setText('No Polygon Cut by the Line.')
+            return
+        self.view_canvas.delete_item_from_scene(it)
+
+        class_of = {id(poly): i for i, polys in enumerate(self.polyitems) for poly in polys}
+        added = []
+        for poly, pieces in cuts:
+            polys = self.polyitems[class_of[id(poly)]]
+            polys.remove(poly)
+            self.view_canvas.delete_item_from_scene(poly)
+            for piece in pieces:
+                new_poly = PolyItemHandle.from_image_coords(
+                    np.asarray(piece.exterior.coords), self._tfw, self._factor, poly.orn_color)
+                self.view_canvas.add_item_to_scene(new_poly)
+                polys.append(new_poly)
+                added.append(new_poly)
+
+        self._poly_index.update([poly for poly, _ in cuts], added)
+        self.le_crop_info.setText(f'{len(cuts)} Polygons Cut.')
+
     
     def data_save(self):
         """ ======= CROP MODE =======
@@ -230,13 +283,55 @@ class parcelGUI(QDialog):
             mask, visual = self._poly_mask_generating()
             windows = self.view_canvas.get_all_crop_win()
 
+            splitter = TrainValSplit(1 - float(self.le_split_ratio.text()))
             self._save_to_local(
                 [self.back_im, mask, visual],
                 windows, wsize, ratio, det_dir,
-                ['JPEGImages', 'SegmentationClass', 'VisualImages'])
+                {'image.png': 'JPEGImages',
+                 'label.png': 'SegmentationClass',
+                 'visual.png': 'VisualImages'},
+                self._valid_pixels(), splitter)
+
+            splitter.save(det_dir.joinpath('ImageSets/Segmentation'))
+            self.le_crop_info.setText('Dataset Producing Completed. ' +
+                summary('parcelGUI._poly_mask_generating', 'parcelGUI._save_to_local'))
+        else:
+            self.polygons_export()
+            self.pb_save.setEnabled(True)
+
+
+    def polygons_export(self):
+        """ ======= POLY / CUT MODE =======
+        Writing the polygons into a GeoPackage or a shapefile
+        directory, one layer per class: the untouched and cut
+        polygons keep their geographic coordinates, only the
+        ones edited by a vertex drag are converted back from
+        the image coordinates, in one pass
+        """
+        path, _ = QFileDialog.getSaveFileName(self,
+            caption='Export Polygons',
+            directory=str(self._im_dir.joinpath(f'{self._filename}_parcel.gpkg')),
+            filter="GeoPackage (*.gpkg);;Shapefile Directory (*)")
+
+        if not path: return  # cancel button pressed
 
-            self._train_val_split(det_dir, 'ImageSets/Segmentation', 'JPEGImages')
-            self.le_crop_info.setText('Dataset Producing Completed.')
+        items = [it for polys in self.polyitems for it in polys]
+        edited = [it for it in items if it.edited]
+        converted = dict(zip(map(id, edited), polygons_to_geo(
+            [it.img_coords for it in edited], self._tfw, self._factor)))
+
+        layers = {}
+        for name, polys in zip(self.classname, self.polyitems):
+            if not polys: continue
+            layers[name] = [converted[id(it)] if it.edited else np.asarray(it.gis_coords)[:, :2]
+                            for it in polys]
+
+        try:
+            polygons_save(path, layers, raster_srs(self._im_path))
+        except (OSError, RuntimeError) as e:  # RuntimeError with gdal.UseExceptions()
+            warning_msg(str(e))
+            return
+        self.le_crop_info.setText('Polygons Exported.')
 
 
     def set_poly_changable(self):
@@ -265,6 +360,7 @@ class parcelGUI(QDialog):
         self.classname = []
         self.polyitems = []
         self.rgnshape = None
+        self._poly_index = PolygonIndex()
 
 
     def _re_initialization(self):
@@ -283,9 +379,12 @@ class parcelGUI(QDialog):
             self.le_wsize.setText('')
 
 
+    @timed()
     def _save_to_local(self, ims: list, windows: list,
                        wsize: int, ratio: float,
-                       dir_root: Path, dir_names: str):
+                       dir_root: Path, layout: dict,
+                       valid: np.ndarray=None,
+                       splitter: TrainValSplit=None):
         """ ======= CROP MODE =======
         Splitting the 'im' into tiles with
         window(crop) size and overlap ratio
@@ -297,45 +396,48 @@ class parcelGUI(QDialog):
             wsize (int): croppin windown size
             ratio (float): tiles overlapped ratio
             dir_root (Path): [description]
-            dir_name (str): [description]
+            layout (dict): sample field of each image -> directory name
+            valid (numpy.ndarray, optional): pixels holding data, the tiles
+                whose no-data fraction reaches `config.max_nodata_ratio`
+                are skipped before being encoded
+            splitter (TrainValSplit, optional): assigning the tiles to the
+                training or validation set as they are saved, by spatial block
+
+        # Returns:
+            list of the saved tile names
         """
         assert isinstance(dir_root, Path)
         assert 0 <= ratio < 1
 
-        for im, dir_name in zip(ims, dir_names):
-            _dir = dir_root.joinpath(dir_name)
-            shutil.rmtree(str(_dir), ignore_errors=True)
-            _dir.mkdir(parents=True)
-
-            tiles = crop_im_into_tiles(im, windows, wsize, ratio, self._factor)
-            for i, tile in enumerate(tiles):
-                cv2.imwrite(str(_dir.joinpath(f'{self._filename}_{i}.png')), tile)
-
+        for dir_name in layout.values():
+            shutil.rmtree(str(dir_root.joinpath(dir_name)), ignore_errors=True)
 
-    def _train_val_split(self, dir_root: Path, dir_name: str, im_dir: str):
-        """ Splitting the training and validation
-        data through image name by specified ratio
+        origins = tile_origins(ims[0].shape[:2], windows, wsize, ratio, self._factor)
+        if valid is not None:
+            nodata = window_fractions(~valid, origins, wsize)
+            origins = origins[nodata < config.max_nodata_ratio]
 
-        # Args:
-            dir_root (Path): [description]
-            dir_name (str): [description]
-            im_dir (str): [description]
-        """
-        assert isinstance(dir_root, Path)
-        det_dir = dir_root.joinpath(dir_name)
-        src_dir = dir_root.joinpath(im_dir)
-        det_dir.mkdir(parents=True, exist_ok=True)
+        imnames = []
+        with open_writer(dir_root, layout) as writer:
+            for i, (y, x) in enumerate(origins):
+                name = f'{self._filename}_{i}'
+                writer.write(name, {
+                    field: im[y: y+wsize, x: x+wsize] for field, im in zip(layout, ims)})
+                imnames.append(writer.sample_key(name))
+                if splitter is not None:
+                    splitter.add(imnames[-1], spatial_block(y, x))
+        return imnames
 
-        imnames = np.array([path.stem for path in src_dir.glob('*.png')])
-        train_num = int(len(imnames) * float(self.le_split_ratio.text()))
-        random.shuffle(imnames)
 
-        with open(str(det_dir.joinpath('train.txt')), 'w') as file:
-            file.writelines('\n'.join(imnames[:train_num]))
-        with open(str(det_dir.joinpath('val.txt')), 'w') as file:
-            file.writelines('\n'.join(imnames[train_num:]))
+    def _valid_pixels(self):
+        """ Pixels of the image holding data, from its
+        alpha channel or the no-data value of the raster """
+        nodata, _ = raster_nodata(self._im_path)
+        alpha = self.back_im[..., 3] if self.back_im.ndim == 3 and self.back_im.shape[2] == 4 else None
+        return valid_pixels(self.back_im, nodata, alpha)
 
 
+    @timed()
     def _poly_mask_generating(self):
         """ ======= CROP MODE =======
         Rasterizing the polygons into
@@ -388,6 +490,11 @@ class parcelGUI(QDialog):
             for it in polys:
                 self.view_canvas.delete_item_from_scene(it)
         self.polyitems = []
+        self._poly_index.reset([])
+
+
+    def _all_polygon_items(self):
+        return [it for polys in self.polyitems for it in polys]
 
 
     def _shpfile_replace_check(self):
@@ -0,0 +1,193 @@
+import numpy as np
+
+from ...common.lazy import lazy_import
+
+shapely = lazy_import('shapely')
+geometry = lazy_import('shapely.geometry')
+ops = lazy_import('shapely.ops')
+strtree = lazy_import('shapely.strtree')
+
+
+# Douglas-Peucker tolerances (image pixels) of the display levels
+simplify_tolerances = (2, 4, 8, 16, 32)
+
+
+def geo_to_image(coords, tfw: tuple, factor: float) -> np.ndarray:
+    """ Converting the geographic coordinates
+    to the (resized) image coordinates
+
+    # Args:
+        coords (array-like): (N, 2) or (N, 3) geographic coordinates
+        tfw (tuple): geographic information
+        factor (float): resize factor
+
+    # Returns:
+        (N, 2) numpy.ndarray of integer pixel coordinates
+    """
+    coords = np.asarray(coords, dtype=np.float64)[:, :2]
+    px = (coords[:, 0] - tfw[0]) / tfw[1] * factor
+    py = (coords[:, 1] - tfw[3]) / tfw[5] * factor
+    # the epsilon keeps the image -> geo -> image round trip
+    # from truncating x.99999 floating errors one pixel down
+    return (np.stack([px, py], axis=1) + 1e-6).astype(int)
+
+
+def image_to_geo(coords, tfw: tuple, factor: float) -> np.ndarray:
+    """ Converting the (resized) image coordinates
+    back to the geographic coordinates
+
+    # Args:
+        coords (array-like): (N, 2) image coordinates
+        tfw (tuple): geographic information
+        factor (float): resize factor
+
+    # Returns:
+        (N, 2) numpy.ndarray of geographic coordinates
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    gx = coords[:, 0] / factor * tfw[1] + tfw[0]
+    gy = coords[:, 1] / factor * tfw[5] + tfw[3]
+    return np.stack([gx, gy], axis=1)
+
+
+def polygons_to_geo(coords: list, tfw: tuple, factor: float) -> list:
+    """ Converting many polygons' image coordinates
+    back to the geographic ones in a single pass
+
+    # Args:
+        coords (list of array-like): (N_i, 2) image coordinates per polygon
+
+    # Returns:
+        list of (N_i, 2) numpy.ndarray
+    """
+    if not coords:
+        return []
+    lengths = [len(c) for c in coords]
+    geo = image_to_geo(np.concatenate([np.asarray(c, dtype=np.float64) for c in coords]), tfw, factor)
+    return np.split(geo, np.cumsum(lengths)[:-1])
+
+
+class PolygonIndex:
+
+    def __init__(self):
+        """ STRtree over the `geometry()` of polygon items,
+        rebuilt lazily at the first query after `reset` or
+        `invalidate`, e.g. once the polygons are edited.
+
+        The items `update` adds (e.g. the pieces of a cut) are
+        scanned linearly and the removed ones skipped, the tree
+        being rebuilt only once these changes add up.
+        """
+        self._items = []
+        self._geoms = []
+        self._tree = None
+        self._removed = set()  # ids of the tree items removed since the build
+        self._added = []       # items added since the build
+
+    def reset(self, items):
+        self._items = list(items)
+        self._tree = None
+        self._removed = set()
+        self._added = []
+
+    def invalidate(self):
+        self._tree = None
+
+    def update(self, removed, added):
+        """ Removing then adding items, without rebuilding the tree """
+        removed = {id(it) for it in removed}
+        self._removed |= removed - {id(it) for it in self._added}
+        self._added = [it for it in self._added if id(it) not in removed] + list(added)
+
+    def _build(self):
+        self._items = [it for it in self._items if id(it) not in self._removed] + self._added
+        self._removed = set()
+        self._added = []
+        self._geoms = [it.geometry() for it in self._items]
+        self._tree = strtree.STRtree(self._geoms) if self._geoms else None
+
+    def query(self, geom) -> list:
+        """ Return the items whose geometry intersects `geom` """
+        changes = len(self._removed) + len(self._added)
+        if self._tree is None or changes > max(64, len(self._items) // 8):
+            self._build()
+        if self._tree is None:
+            return []
+
+        hits = self._tree.query(geom)
+        if len(hits) and not isinstance(hits[0], (int, np.integer)):
+            # shapely < 2.0 returns the geometries themselves
+            position = {id(g): i for i, g in enumerate(self._geoms)}
+            hits = [position[id(g)] for g in hits]
+        items = [self._items[i] for i in sorted(hits)
+                 if id(self._items[i]) not in self._removed and self._geoms[i].intersects(geom)]
+        return items + [it for it in self._added if it.geometry().intersects(geom)]
+
+
+def split_polygons(index: PolygonIndex, line) -> list:
+    """ Splitting the polygons crossed by the line
+
+    # Args:
+        index (PolygonIndex): index of the polygon items
+        line (shapely.LineString): cutting line
+
+    # Returns:
+        list of (item, list of shapely.Polygon pieces),
+        only for the items actually split into several pieces
+    """
+    results = []
+    for it in index.query(line):
+        try:
+            pieces = ops.split(it.geometry(), line)
+        except Exception:
+            # GEOS errors on invalid (e.g. self-intersecting) polygons,
+            # whose exception types differ between shapely versions
+            continue
+        pieces = [g for g in pieces.geoms if isinstance(g, geometry.Polygon) and not g.is_empty]
+        if len(pieces) > 1:
+            results.append((it, pieces))
+    return results
+
+
+def _exterior(geom) -> np.ndarray:
+    """ Return the exterior coordinates, None if
+    the simplification collapsed the polygon """
+    if geom is None or geom.is_empty or not isinstance(geom, geometry.Polygon):
+        return None
+    coords = np.asarray(geom.exterior.coords)[:, :2]
+    return coords if len(coords) >= 4 else None
+
+
+def simplify_coords(geom, tolerance: float) -> np.ndarray:
+    """ Douglas-Peucker simplified exterior of a single polygon
+
+    # Returns:
+        (N, 2) numpy.ndarray, None if collapsed
+    """
+    return _exterior(geom.simplify(tolerance, preserve_topology=False))
+
+
+def simplify_layer(geoms: list, tolerances=simplify_tolerances) -> list:
+    """ Douglas-Peucker simplifying all the polygons
+    of a layer at several tolerances at once
+
+    # Args:
+        geoms (list of shapely.Polygon): polygons of the layer
+        tolerances (tuple of float): simplification tolerances
+
+    # Returns:
+        list of {tolerance: (N, 2) numpy.ndarray or None} per polygon
+    """
+    levels = [dict() for _ in geoms]
+    if not geoms:
+        return levels
+
+    for tol in tolerances:
+        if hasattr(shapely, 'simplify'):
+            # shapely >= 2.0 simplifies the whole array in GEOS
+            simples = shapely.simplify(np.array(geoms, dtype=object), tol, preserve_topology=False)
+        else:
+            simples = [g.simplify(tol, preserve_topology=False) for g in geoms]
+        for level, simple in zip(levels, simples):
+            level[tol] = _exterior(simple)
+    return levels
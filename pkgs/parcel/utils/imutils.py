@@ -1,12 +1,11 @@
-import cv2
 import numpy as np
 from pathlib import Path
-from skimage.util.shape import view_as_windows
 
-try:
-    from osgeo import gdal
-except ImportError:
-    import gdal
+from ...common.lazy import lazy_import
+from ...common.tilestats import grid_origins
+
+cv2 = lazy_import('cv2')
+gdal = lazy_import('osgeo.gdal', 'gdal')
 
 
 def resize_image(im_path: Path, pixel_size):
@@ -24,23 +23,28 @@ def resize_image(im_path: Path, pixel_size):
     return im, im_shape, im_factor, tfw
 
 
-def crop_im_into_tiles(img, windows, wsize, overlap, factor):
-    if len(img.shape) == 2:
-        tsize = (wsize,)*2
-    else:
-        tsize = (wsize, wsize, img.shape[-1])
+def tile_origins(im_shape, windows, wsize, overlap, factor) -> np.ndarray:
+    """ Top-left corners (y, x) of the tiles splitting the
+    windows, windows smaller than a tile are skipped
+
+    # Args:
+        im_shape (tuple): image (height, width)
+        windows (list of tuple): cropped regions (display coordinates)
+        wsize (int): tile size
+        overlap (float): tiles overlapped ratio
+        factor (float): display resize factor
 
-    tiles = []
-    stride = int(wsize * (1-overlap))
+    # Returns:
+        (N, 2) numpy.ndarray
+    """
+    stride = max(int(wsize * (1-overlap)), 1)
+    origins = [np.empty((0, 2), dtype=int)]
     for window in windows:
         x1, y1, x2, y2 = (np.array(window) / factor).astype('int')
-        tpim = img[y1: y2, x1: x2]
-        try:
-            tile = view_as_windows(tpim, tsize, stride).reshape(-1, *tsize)
-            tiles.extend(tile)
-        except:
-            continue
-    return tiles
+        x1, x2 = np.clip([x1, x2], 0, im_shape[1])
+        y1, y2 = np.clip([y1, y2], 0, im_shape[0])
+        origins.append(grid_origins(y2 - y1, x2 - x1, wsize, stride) + (y1, x1))
+    return np.concatenate(origins)
 
 
 def random_90_rotation(images, seed=53):
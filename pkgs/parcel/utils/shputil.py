@@ -1,17 +1,21 @@
 
 
 import json
-import ogr
+import numpy as np
 from pathlib import Path
-from shapely.geometry.polygon import Polygon
 
-try:
-    from osgeo import gdal
-except ImportError:
-    import gdal
+from ...common.lazy import lazy_import
+from ...common.profiling import timed, count
 
+gdal = lazy_import('osgeo.gdal', 'gdal')
+ogr = lazy_import('osgeo.ogr', 'ogr')
+osr = lazy_import('osgeo.osr', 'osr')
+shapely = lazy_import('shapely')
+polygon = lazy_import('shapely.geometry.polygon')
 
-def shppoly_extract(path, filter: Polygon=None):
+
+@timed()
+def shppoly_extract(path, filter: 'polygon.Polygon'=None):
     """  loading shapefile then parsing, converting
     it into shapely.geometry.polygon.Polygon
 
@@ -37,10 +41,11 @@ def shppoly_extract(path, filter: Polygon=None):
         coords = first['geometry']['coordinates'] 
         if poly_type == 'Polygon': coords = [coords]        
         for coord in coords:
-            poly = Polygon(coord[0])
+            poly = polygon.Polygon(coord[0])
             if filter and not filter.contains(poly): continue
             polys.append(poly)
             
+    count('parcel.polygons_loaded', len(polys))
     return polys
 
 
@@ -63,6 +68,62 @@ def rgnshp_generate(ipath, tfw=None):
 
     lt = (tfw[0], tfw[3]) # left top cood
     rb = (tfw[0]+tfw[1]*ds.RasterXSize, tfw[3]+tfw[5]*ds.RasterYSize) # right bottom coord
-    return Polygon([lt, (rb[0], lt[1]), rb, (lt[0], rb[1])])
+    return polygon.Polygon([lt, (rb[0], lt[1]), rb, (lt[0], rb[1])])
+
+
+def raster_srs(ipath):
+    """ Return the spatial reference (WKT) of the image """
+    return gdal.Open(str(ipath)).GetProjection()
+
+
+def _polygons_wkb(coords: list) -> list:
+    polys = [polygon.Polygon(c) for c in coords]
+    if hasattr(shapely, 'to_wkb'):
+        # shapely >= 2.0 serializes the whole array in GEOS
+        return list(shapely.to_wkb(np.array(polys, dtype=object)))
+    return [p.wkb for p in polys]
+
+
+def polygons_save(path, layers: dict, srs: str=None):
+    """ Writing the polygons into a GeoPackage (`.gpkg`) or
+    a directory of shapefiles, one layer per class, all
+    features being written in a single transaction when
+    the driver supports it.
+
+    # Args:
+        path (str, Path): `.gpkg` file or shapefile directory
+        layers (dict): {layer name: list of (N, 2) geographic coordinates}
+        srs (str, optional): spatial reference WKT. Defaults to None.
+    """
+    path = Path(path)
+    driver = ogr.GetDriverByName('GPKG' if path.suffix == '.gpkg' else 'ESRI Shapefile')
+    if path.exists():
+        driver.DeleteDataSource(str(path))
+    ds = driver.CreateDataSource(str(path))
+    if ds is None:
+        raise OSError(f'Unable to create {path}.')
 
+    ref = None
+    if srs:
+        ref = osr.SpatialReference()
+        ref.ImportFromWkt(srs)
 
+    transaction = ds.TestCapability(ogr.ODsCTransactions)
+    if transaction: ds.StartTransaction()
+    try:
+        for name, coords in layers.items():
+            layer = ds.CreateLayer(str(name), ref, ogr.wkbPolygon)
+            layer.CreateField(ogr.FieldDefn('class', ogr.OFTString))
+            defn = layer.GetLayerDefn()
+            for wkb in _polygons_wkb(coords):
+                feature = ogr.Feature(defn)
+                feature.SetField('class', str(name))
+                feature.SetGeometryDirectly(ogr.CreateGeometryFromWkb(wkb))
+                layer.CreateFeature(feature)
+    except Exception:
+        if transaction: ds.RollbackTransaction()
+        raise
+    else:
+        if transaction: ds.CommitTransaction()
+    finally:
+        ds = None  # flushing and closing the datasource
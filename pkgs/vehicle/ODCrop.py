@@ -1,11 +1,19 @@
-import cv2
 import shutil
 import numpy as np
 import xml.etree.ElementTree as ET
-from pascal_voc_writer import Writer
 from glob import glob
 from pathlib import Path
 
+from ..common import config
+from ..common.export import DirectoryWriter, codec_of, open_writer
+from ..common.lazy import lazy_import
+from ..common.profiling import timed, count
+from ..common.split import TrainValSplit
+from .config import annotation_formats, annotation_classes
+from .utils.annotations import CocoAnnotations, yolo_labels
+
+cv2 = lazy_import('cv2')
+
 
 def _dir_create(path, delete=False):
     path = Path(path)
@@ -34,6 +42,15 @@ def parse_rec(filename):
     return objects
 
 
+def class_names(bnb_dir) -> list:
+    """ Sorted names of the object classes over all
+    the PASCAL VOC xml files of `bnb_dir` """
+    names = set()
+    for path in sorted(Path(bnb_dir).glob('*.xml')):
+        names.update(name.text for name in ET.parse(str(path)).iterfind('object/name'))
+    return sorted(names)
+
+
 def subbbox_extract(img, objects, bbox=None):
     if bbox is None:
         bbox = [0, 0, img.shape[1], img.shape[0]]
@@ -60,41 +77,92 @@ def subbbox_extract(img, objects, bbox=None):
     return im_orgn, result, result_objects
 
 
-def train_test_split(all_fn, dir, ratio):
-    assert 0 < ratio  < 1
-    train_num = int(len(all_fn) * (1 - ratio))
-    
-    train_fn = np.random.choice(all_fn, train_num, replace=False)
-    train_fn.sort()
-    test_fn = np.setdiff1d(all_fn, train_fn)
-    test_fn.sort()
+def _sub_element(parent, tag: str, text=None):
+    element = ET.SubElement(parent, tag)
+    if text is not None:
+        element.text = str(text)
+    return element
+
+
+def voc_annotation(path, width: int, height: int, objects: list, depth: int=3) -> bytes:
+    """ Pascal VOC annotation of the image, with the
+    elements `pascal_voc_writer.Writer.save` writes
+
+    # Args:
+        path (Path): image path
+        width, height (int): image size
+        objects (list of dict): objects ('name', 1-based 'bbox')
+        depth (int): image channels
+
+    # Returns:
+        xml file content
+    """
+    path = Path(path).absolute()
+    root = ET.Element('annotation')
+    _sub_element(root, 'folder', path.parent.name)
+    _sub_element(root, 'filename', path.name)
+    _sub_element(root, 'path', path)
+    _sub_element(_sub_element(root, 'source'), 'database', 'Unknown')
+    size = _sub_element(root, 'size')
+    for tag, value in zip(('width', 'height', 'depth'), (width, height, depth)):
+        _sub_element(size, tag, value)
+    _sub_element(root, 'segmented', 0)
 
-    with open(str(Path(dir).joinpath('trainval.txt')), 'w') as f:
-        f.writelines('\n'.join(all_fn))
-    with open(str(Path(dir).joinpath('train.txt')), 'w') as f:
-        f.writelines('\n'.join(train_fn))
-    with open(str(Path(dir).joinpath('val.txt')), 'w') as f:
-        f.writelines('\n'.join(test_fn))
+    for obj in objects:
+        element = _sub_element(root, 'object')
+        _sub_element(element, 'name', obj['name'])
+        _sub_element(element, 'pose', 'Unspecified')
+        _sub_element(element, 'truncated', 0)
+        _sub_element(element, 'difficult', 0)
+        bndbox = _sub_element(element, 'bndbox')
+        for tag, value in zip(('xmin', 'ymin', 'xmax', 'ymax'), obj['bbox']):
+            _sub_element(bndbox, tag, int(value))
+    return ET.tostring(root)
 
 
 class ODCropData:
 
-    def __init__(self, data_path, bboxes, angles=None):
+    def __init__(self, data_path, bboxes, angles=None, formats=None, val_ratio=0.05):
+        """ Extracting the crops and their annotations of the frames
+
+        # Args:
+            data_path (str or Path): frames directory ('images' and 'bnboxes')
+            bboxes (list): crop regions [xmin, ymin, xmax, ymax]
+            angles (list, optional): rotation angles. Defaults to [0].
+            formats (tuple, optional): annotation formats, any of 'voc',
+                'coco' and 'yolo'. Defaults to `config.annotation_formats`.
+            val_ratio (float): validation ratio
+        """
         self.data_path = Path(data_path)
         self.filename = self.data_path.stem
         self.im_path = self.data_path.joinpath('images')
         self.bnb_path = self.data_path.joinpath('bnboxes')
         self.out_im = self.data_path.joinpath('PascalVOC/JPEGImages')
-        self.out_bb = self.data_path.joinpath('PascalVOC/Annotations')
-        self.out_vs = self.data_path.joinpath('PascalVOC/VisualImages')
-        _dir_create(self.out_im, delete=True)
-        _dir_create(self.out_bb, delete=True)
-        _dir_create(self.out_vs, delete=True)
         self.extract_bboxes = bboxes
         self.angles = [0] if angles is None else angles
         self.all_filename = []
-
-
+        self.splitter = TrainValSplit(val_ratio)
+        self.formats = annotation_formats if formats is None else formats
+        self.coco = None
+        if {'coco', 'yolo'} & set(self.formats):
+            self.coco = CocoAnnotations(annotation_classes or class_names(self.bnb_path))
+
+        layout = {'image.jpg': 'JPEGImages', 'visual.jpg': 'VisualImages'}
+        if 'voc' in self.formats:
+            layout['annotation.xml'] = 'Annotations'
+        if 'yolo' in self.formats:
+            layout['yolo.txt'] = 'labels'
+
+        # the crops differ in size, which the array stores can't hold
+        fmt = 'files' if config.output_format == 'arrays' else None
+        self.writer = open_writer(self.data_path.joinpath('PascalVOC'), layout, fmt)
+        if isinstance(self.writer, DirectoryWriter):
+            # emptying the directories of a previous extraction
+            for subdir in layout.values():
+                _dir_create(self.data_path.joinpath('PascalVOC', subdir), delete=True)
+
+
+    @timed()
     def extract(self, path):
         path = Path(path)
         im = cv2.imread(str(path))
@@ -111,61 +179,58 @@ class ODCropData:
                 rotated_ob = self._affine_objects(M, objects)
 
                 sub_im_fn = f'{path.stem}_{bbid}_{aid}'
-                sub_im_path = self.out_im.joinpath(f'{sub_im_fn}.jpg')
+                sub_im_path = self.out_im.joinpath(f'{sub_im_fn}.{codec_of("image.jpg")}')
+                # the name the sample is stored under, e.g. in the shards
+                key = self.writer.sample_key(sub_im_fn)
                 sub_im_orgn, sub_im_visual, sub_objects = subbbox_extract(rotated_im, rotated_ob, ebbox)
-                self.all_filename.append(sub_im_fn)
-
-                cv2.imwrite(str(sub_im_path), sub_im_orgn)
-                cv2.imwrite(str(self.out_vs.joinpath(f'{sub_im_fn}.jpg')), sub_im_visual)
-
-                writer = Writer(str(sub_im_path), sub_im_orgn.shape[1], sub_im_orgn.shape[0])
-                for obj in sub_objects:
-                    writer.addObject(obj['name'], *obj['bbox'])
-                writer.save(str(self.out_bb.joinpath(f'{sub_im_fn}.xml')))
-
-
-    def split(self, ratio=0.05):
+                self.all_filename.append(key)
+                # the crops and rotations of a frame share the set
+                self.splitter.add(key, path.stem)
+
+                h, w = sub_im_orgn.shape[:2]
+                sample = {'image.jpg': sub_im_orgn, 'visual.jpg': sub_im_visual}
+                if 'voc' in self.formats:
+                    sample['annotation.xml'] = voc_annotation(sub_im_path, w, h, sub_objects)
+                if self.coco is not None:
+                    boxes = self.coco.add(f'{key}.{codec_of("image.jpg")}', w, h, sub_objects)
+                    if 'yolo' in self.formats:
+                        sample['yolo.txt'] = yolo_labels(boxes, w, h)
+
+                self.writer.write(sub_im_fn, sample)
+        count('vehicle.crops_written', len(self.extract_bboxes) * len(self.angles))
+
+
+    def close(self):
+        """ Flushing the writer and the annotations
+        accumulated over all the extracted frames """
+        self.writer.close()
+        if 'coco' in self.formats:
+            self.coco.save(self.data_path.joinpath('PascalVOC/instances.json'))
+        if 'yolo' in self.formats:
+            self.coco.save_classes(self.data_path.joinpath('PascalVOC/classes.txt'))
+
+
+    def split(self):
+        self.close()
         if self.filename:
             out_db = self.data_path.joinpath('PascalVOC/ImageSets/Main')
             _dir_create(out_db, delete=True)
-            train_test_split(self.all_filename, out_db, ratio=ratio)
+            self.splitter.save(out_db, trainval=True)
             return True
         return False
 
 
+    def frame_paths(self) -> list:
+        """ Return the frame paths, sorted so that the crops
+        and their COCO image ids are in the same order
+        whatever the file system listing order """
+        return sorted(glob(str(self.im_path.joinpath('*.png'))))
+
+
     def extract_all(self):
-    
-        paths = glob(str(self.im_path.joinpath('*.png')))
-        for path in paths:
-            path = Path(path)
-            im = cv2.imread(str(path))
-            objects = parse_rec(self.bnb_path.joinpath(f'{path.stem}.xml'))
-
-            for bbid, ebbox in enumerate(self.extract_bboxes):
-                center = self._compute_center_by_bbox(ebbox)
-
-                for aid, angle in enumerate(self.angles):
-                    scale = np.random.uniform(0.8, 1.0)
-                    M = cv2.getRotationMatrix2D(center, angle, scale)
-                    rotated_im = cv2.warpAffine(im, M, (im.shape[1], im.shape[0]))
-                    rotated_ob = self._affine_objects(M, objects)
-
-                    sub_im_fn = f'{path.stem}_{bbid}_{aid}'
-                    sub_im_path = self.out_im.joinpath(f'{sub_im_fn}.jpg')
-                    sub_im_orgn, sub_im_visual, sub_objects = subbbox_extract(rotated_im, rotated_ob, ebbox)
-                    self.all_filename.append(sub_im_fn)
-
-                    cv2.imwrite(str(sub_im_path), sub_im_orgn)
-                    cv2.imwrite(str(self.out_vs.joinpath(f'{sub_im_fn}.jpg')), sub_im_visual)
-
-                    writer = Writer(str(sub_im_path), sub_im_orgn.shape[1], sub_im_orgn.shape[0])
-                    for obj in sub_objects:
-                        writer.addObject(obj['name'], *obj['bbox'])
-                    writer.save(str(self.out_bb.joinpath(f'{sub_im_fn}.xml')))
-
-        out_db = self.data_path.joinpath('PascalVOC/ImageSets/Main')
-        _dir_create(out_db, delete=True)
-        train_test_split(self.all_filename, out_db, ratio=0.05)
+        for path in self.frame_paths():
+            self.extract(path)
+        self.split()
 
 
     def _compute_center_by_bbox(self, bbox):
@@ -5,6 +5,25 @@ label_o = (-6, -23)  # label text offset
 lback_o = (-5, -23)  # label backgorund text offset
 
 
+#######################
+# Frame Prefetching
+######################
+prefetch_radius = 3  # frames decoded ahead on each side
+cache_size_mb = 1024  # memory bound of the decoded frame cache
 
 
+#######################
+# Annotation Saving
+######################
+autosave = False  # saving the changed frame when switching frames
 
+
+#######################
+# Dataset Extraction
+######################
+# any of 'voc' (an .xml per crop), 'coco' (a single
+# instances.json) and 'yolo' (a .txt per crop)
+annotation_formats = ('voc',)
+# class names numbered in this order by 'coco' and 'yolo',
+# None for the sorted class names of all the frames
+annotation_classes = None
@@ -1,98 +1,29 @@
-import cv2
-import numpy as np
 import threading
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 
+from ...common.hittest import item_at
+from ...common.viewer import PhotoViewer as BasePhotoViewer
+from ..utils.imutils import read_image
+from .rect import RectItem
+from .rect_handle import RectItemHandle
 
-class PhotoViewer(QGraphicsView):
-    def __init__(self, parent=None):
-        super(PhotoViewer, self).__init__(parent)
-        self._zoom = 0
-        self._empty = True
-        self._grabbed = False
-        self._scene = QGraphicsScene(self)
-        self._photo = QGraphicsPixmapItem()
-        self._scene.addItem(self._photo)
-        
-        self.setScene(self._scene)
-        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
-        self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
-        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.setFrameShape(QFrame.NoFrame)
-
-
-    def hasPhoto(self):
-        return not self._empty
-
-
-    def fitInView(self, scale=True):
-        rect = QRectF(self._photo.pixmap().rect())
-        if not rect.isNull():
-            self.setSceneRect(rect)
-            if self.hasPhoto():
-                unity = self.transform().mapRect(QRectF(0, 0, 1, 1))
-                self.scale(1 / unity.width(), 1 / unity.height())
-                #viewrect = self.viewport().rect()
-                viewrect = self.geometry()
-                viewrect.setRect(0, 0, viewrect.width(), viewrect.height())
-                scenerect = self.transform().mapRect(rect)
-                factor = max(viewrect.width() / scenerect.width(),
-                             viewrect.height() / scenerect.height())
-                self.scale(factor, factor)
-            self._zoom = 0
 
+class PhotoViewer(BasePhotoViewer):
 
     def setPhoto(self, back_im=None):
-        self.back_im_path = back_im
-        self.back_im = cv2.imread(back_im)
-        pixmap = QPixmap(back_im)
-        self._zoom = 0
-        if pixmap and not pixmap.isNull():
-            self._empty = False
-            self.setDragMode(QGraphicsView.ScrollHandDrag)
-            self._photo.setPixmap(pixmap)
-            print(self._photo.pixmap().rect())
-        else:
-            self._empty = True
-            self.setDragMode(QGraphicsView.NoDrag)
-            self._photo.setPixmap(QPixmap())
-        self.fitInView()
-
-
-    def zoom_in(self):
-        if self.hasPhoto():
-            factor = 1.25
-            self._zoom += 1
-            if self._zoom > 0:
-                self.scale(factor, factor)
-            else:
-                self._zoom = 0
-                self.fitInView()
-
-
-    def zoom_out(self):
-        if self.hasPhoto():
-            factor = 0.8
-            self._zoom -= 1
-            if self._zoom > 0:
-                self.scale(factor, factor)
-            else:
-                self._zoom = 0 
-                self.fitInView()
-    
+        self.setDecodedPhoto(back_im, *read_image(back_im))
 
-    def wheelEvent(self, event):
-        numDegrees = event.angleDelta() / 8
-        numSteps = (numDegrees / 15).y()
-        
-        if self.hasPhoto() and event.modifiers() == Qt.ControlModifier:
-            if numSteps > 0:
-                self.zoom_in()
-            elif numSteps < 0:
-                self.zoom_out()
+
+    def setDecodedPhoto(self, back_im_path, back_im, qim):
+        """
+        Showing the image already decoded by `read_image`,
+        e.g. on a loading thread.
+        """
+        self.back_im_path = back_im_path
+        self.back_im = back_im
+        self.setPixmap(QPixmap.fromImage(qim))
 
 
 #################################################
@@ -122,15 +53,17 @@ class LabelCanvas(PhotoViewer):
 
     
     def mouseMoveEvent(self, mouseEvent):
-        for it in self.all_items:
-            if it.rect().contains(self.mapToScene(mouseEvent.pos())):
-                self.in_items_range = True
-                break
-            else:
-                self.in_items_range = False
+        self.in_items_range = self.item_at(self.mapToScene(mouseEvent.pos())) is not None
         super().mouseMoveEvent(mouseEvent)
 
 
+    def item_at(self, pos):
+        """
+        Returns the topmost bnbox under the scene position `pos`.
+        """
+        return item_at(self._scene, pos, RectItemHandle)
+
+
     def add_item_to_scene(self, it):
         self.all_items.append(it)
         self._scene.addItem(it)
@@ -158,6 +91,48 @@ class LabelCanvas(PhotoViewer):
 #################################################
 
 
+class CropOverlay(QGraphicsItem):
+    def __init__(self, windows: list, ratio: float=0.65):
+        """
+        Semi-transparent layer dimming the photo outside the crop
+        windows. Only the exposed area is painted, so moving a
+        window repaints the rects it left and entered, not the frame.
+        """
+        super().__init__()
+        self.windows = windows
+        self._rect = QRectF()
+        self._brush = QBrush(QColor(0, 0, 0, round(255 * ratio)))
+        self.setAcceptedMouseButtons(Qt.NoButton)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+
+    def setRect(self, rect: QRectF):
+        self.prepareGeometryChange()
+        self._rect = QRectF(rect)
+        self.update()
+
+
+    def boundingRect(self):
+        return self._rect
+
+
+    def paint(self, painter, option, widget=None):
+        if not self.windows: return
+        exposed = option.exposedRect & self._rect
+        region = QPainterPath()
+        region.addRect(exposed)
+        crop_region = QPainterPath()
+        crop_region.setFillRule(Qt.WindingFill)
+        for it in self.windows:
+            if it.current_rect.intersects(exposed):
+                crop_region.addRect(it.current_rect)
+        painter.fillPath(region.subtracted(crop_region), self._brush)
+
+
+#################################################
+#################################################
+
+
 class CropCanvas(PhotoViewer):
     def __init__(self, parent, geometry: QRect):
         super(CropCanvas, self).__init__(parent)
@@ -167,42 +142,49 @@ class CropCanvas(PhotoViewer):
         self._grabbed = False
         self.crop_win = []
 
+        # dimming the region outside crop windows
+        self._overlay = CropOverlay(self.crop_win)
+        self._scene.addItem(self._overlay)
+
+
+    def setPixmap(self, pixmap: QPixmap):
+        super().setPixmap(pixmap)
+        self._overlay.setRect(QRectF(self._photo.pixmap().rect()))
+
 
     def mousePressEvent(self, mouseEvent):
         if mouseEvent.modifiers() == Qt.ShiftModifier and mouseEvent.buttons() == Qt.RightButton:
-            mousePos = self.mapToScene(mouseEvent.pos())
-            for idx, it in enumerate(self.crop_win):
-                if it.current_rect.contains(mousePos):
-                    self._scene.removeItem(it)
-                    del self.crop_win[idx]
-                    self.focusBackImage()
-                    break
+            it = item_at(self._scene, self.mapToScene(mouseEvent.pos()), RectItem)
+            if it is not None:
+                self._scene.removeItem(it)
+                self.crop_win.remove(it)
+                self._overlay.update()
         super().mousePressEvent(mouseEvent)
 
 
-    def mouseReleaseEvent(self, mouseEvent):
-        if self.grabbed:
-            self.focusBackImage()
-            self.grabbed = False
-        super().mouseReleaseEvent(mouseEvent)
-
-
     def mouseMoveEvent(self, mouseEvent):
-        self.grabbed = True if self._scene.mouseGrabberItem() else False
         if mouseEvent.modifiers() == Qt.ControlModifier or self._scene.mouseGrabberItem():
             super().mouseMoveEvent(mouseEvent)
 
 
     def add_item_to_scene(self, it):
+        it.moved = self.window_moved
         self.crop_win.append(it)
         self._scene.addItem(it)
-        self.focusBackImage()
+        self._overlay.update(self._overlay.boundingRect() if len(self.crop_win) == 1 else it.current_rect)
+
+
+    def window_moved(self, old: QRectF, new: QRectF):
+        """ Repainting the overlay where the crop window `old` rect was and now is """
+        self._overlay.update(old)
+        self._overlay.update(new)
 
 
     def clear_all_items(self):
         for it in self.crop_win:
             self._scene.removeItem(it)
-        self.crop_win = []
+        self.crop_win.clear()
+        self._overlay.update()
 
 
     def all_crop_bboxes(self):
@@ -211,22 +193,3 @@ class CropCanvas(PhotoViewer):
             x, y, w, h = list(map(int, it.current_rect.getRect()))
             bboxes.append([x, y, x + w, y + h])
         return bboxes
-
-
-    def focusBackImage(self):
-        height, width, channel = self.back_im.shape
-
-        crop_region = np.zeros((self.back_im.shape[0], self.back_im.shape[1]), dtype='uint8')
-        for it in self.crop_win:
-            xmin, ymin, w, h = list(map(int, it.current_rect.getRect()))
-            crop_region[max(0, ymin): ymin + h, max(0, xmin): xmin + w] = 1
-
-        mask = self.back_im.copy()
-        for ch in range(channel):
-            mask[..., ch] *= crop_region
-
-        mRatio = 0.65
-        dst = cv2.addWeighted(self.back_im, 1 - mRatio, mask, mRatio, 0)
-        qDst = QImage(dst, width, height, QImage.Format_RGB888)
-        self._photo.setPixmap(QPixmap.fromImage(qDst))
-
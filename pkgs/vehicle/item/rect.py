@@ -10,6 +10,7 @@ class RectItem(QGraphicsRectItem):
         """
         super().__init__(*args)
         self.current_rect = self.rect()
+        self.moved = None  # callback(old rect, new rect) of the scene rect changes
         self.setAcceptHoverEvents(True)
         self.setFlag(QGraphicsItem.ItemIsMovable, True)
         self.setFlag(QGraphicsItem.ItemIsSelectable, True)
@@ -29,6 +30,7 @@ class RectItem(QGraphicsRectItem):
 
     def itemChange(self, change, value):
         if isinstance(value, QPointF):
+            old = QRectF(self.current_rect)
             diffX = value.x()
             diffY = value.y()
             rect = self.rect()
@@ -36,4 +38,6 @@ class RectItem(QGraphicsRectItem):
             self.current_rect.setTop(round(rect.top() + diffY))
             self.current_rect.setWidth(rect.width())
             self.current_rect.setHeight(rect.height())
+            if self.moved is not None and self.current_rect != old:
+                self.moved(old, QRectF(self.current_rect))
         return super().itemChange(change, value)
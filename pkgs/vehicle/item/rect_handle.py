@@ -38,6 +38,10 @@ class RectItemHandle(QGraphicsRectItem):
     handleSize = +16.0
     handleSpace = -8.0
 
+    # level of detail (device pixels per scene unit) thresholds
+    handleLod = 0.5
+    fillLod = 0.25
+
     handleCursors = {
         handleTopLeft: Qt.SizeFDiagCursor,
         handleTopRight: Qt.SizeBDiagCursor,
@@ -264,12 +268,15 @@ class RectItemHandle(QGraphicsRectItem):
         """
         # drawing the bounding box rect
         # (1, 254, 129)
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
 
-        painter.setBrush(QBrush(QColor(1, 254, 129, 30)))
+        painter.setBrush(QBrush(QColor(1, 254, 129, 30)) if lod >= self.fillLod else Qt.NoBrush)
         painter.setPen(QPen(QColor(1, 254, 129), 1.2, style=Qt.SolidLine, cap=Qt.RoundCap, join=Qt.RoundJoin))
         painter.drawRect(self.originRect())
 
-        # drawing the circle handles
+        # drawing the circle handles, skipped once too small to be grabbed
+        if lod < self.handleLod:
+            return
         painter.setRenderHint(QPainter.Antialiasing)
         painter.setBrush(QBrush(QColor(255, 255, 255)))
         painter.setPen(QPen(QColor(1, 254, 129, 255), 1.0, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from ...common.stylesheet import load_stylesheet, preload_stylesheets
+
 
 def connect_to_stylesheet(fn, dir=None):
     if dir is None:
@@ -7,9 +9,4 @@ def connect_to_stylesheet(fn, dir=None):
     else: 
         dir = Path(dir)
 
-    full_path = dir.joinpath(f'{fn}.txt')
-    if not full_path.exists():
-        raise FileExistsError(f'{fn} not exist in {str(dir)}.')
-    else:
-        lines = open(str(full_path), 'r').readlines()
-        return ' '.join([line.strip() for line in lines])
+    return load_stylesheet(fn, dir)
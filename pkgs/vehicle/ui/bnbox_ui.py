@@ -1,21 +1,23 @@
 import os
 os.environ["OPENCV_IO_MAX_IMAGE_PIXELS"] = pow(2, 40).__str__()
 
-import cv2
 import numpy as np
 import xml.etree.ElementTree as ET
 import threading
 from glob import glob
-from pascal_voc_writer import Writer
 from pathlib import Path
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from PyQt5.uic import loadUi
 
+from ...common.lazy import lazy_import
+from ...common.uiloader import load_ui
 from ..dialog.error import warning_msg
 from ..item import LabelCanvas, RectItemHandle
 from ..style.pbutton import push_button_setting
+from ..utils.imutils import image_size
+
+pascal_voc_writer = lazy_import('pascal_voc_writer')
 
 
 classes = {'vehicle', 'bus', 'truck'}
@@ -62,14 +64,13 @@ def parse_rec(filename):
 class bnboxUI(QWidget):    
     def __init__(self, parent=None):
         super(bnboxUI, self).__init__(parent)
-        loadUi('GUI/widget_bnbox.ui', self)
+        load_ui('GUI/widget_bnbox.ui', self)
 
         self._data_path = None
         self._push_button_setup()
 
         geometry = self.canvas.geometry()
         self.canvas = LabelCanvas(self, geometry)
-        self.canvas.setViewportUpdateMode(0)
         self.canvas.clear_items()
 
         self.le_new_class.returnPressed.connect(self.add_new_class)
@@ -258,8 +259,8 @@ class bnboxUI(QWidget):
     def save_data(self):
         for i, s in enumerate(self.saved):
             if s:
-                h, w = cv2.imread(self._im_path[i]).shape[:2]
-                writer = Writer(self._im_path[i], w, h)
+                h, w = image_size(self._im_path[i])
+                writer = pascal_voc_writer.Writer(self._im_path[i], w, h)
                 for it in self._all_bnboxes[i]:
                     label = it.label.toPlainText()
                     coords = list(map(round, it.originRect().getCoords()))
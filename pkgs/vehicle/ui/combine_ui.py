@@ -1,23 +1,26 @@
 import os
 os.environ["OPENCV_IO_MAX_IMAGE_PIXELS"] = pow(2, 40).__str__()
 
-import cv2
 import numpy as np
 import xml.etree.ElementTree as ET
 import threading
 from glob import glob
-from pascal_voc_writer import Writer
 from pathlib import Path
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from PyQt5.uic import loadUi
 
+from ...common.profiling import stage, summary
+from ...common.uiloader import load_ui
+from ..config import prefetch_radius, cache_size_mb, autosave
 from ..dialog.error import warning_msg
 from ..item import LabelCanvas, CropCanvas, RectItem, RectItemHandle
 from ..ODCrop import ODCropData
 from ..style.pbutton import push_button_setting
-from ..style.stylesheet import connect_to_stylesheet
+from ..style.stylesheet import connect_to_stylesheet, preload_stylesheets
+from ..utils.imutils import image_size, read_image
+from ..utils.prefetch import FramePrefetcher
+from ..utils.writer import AnnotationWriter
 
 
 classes = {'vehicle', 'bus', 'truck'}
@@ -79,15 +82,66 @@ def parse_rec(filename):
     return objects
 
 
+class LoadWorker(QObject):
+    finished = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+    progress = pyqtSignal(int)
+
+    def __init__(self, im_dir: Path, bnb_dir: Path, ext: str, parent=None) -> None:
+        """ Scanning the dataset directory, parsing the
+        annotations and decoding the first frame off the GUI thread
+
+        # Args:
+            im_dir (Path): image directory
+            bnb_dir (Path): annotation directory
+            ext (str): image extension
+        """
+        super().__init__(parent=parent)
+        self.im_dir = im_dir
+        self.bnb_dir = bnb_dir
+        self.ext = ext
+
+    def run(self):
+        try:
+            result = self._load()
+        except Exception as err:
+            self.failed.emit(str(err))
+        else:
+            self.finished.emit(result)
+
+    def _load(self) -> dict:
+        im_path = sorted(glob(str(self.im_dir.joinpath(f'*.{self.ext}'))))
+        bnb_path = sorted(glob(str(self.bnb_dir.joinpath('*.xml'))))
+
+        all_objects, percent = [], -1
+        for i, path in enumerate(bnb_path):
+            all_objects.append(parse_rec(path))
+            if int((i+1) / len(bnb_path) * 100) != percent:
+                percent = int((i+1) / len(bnb_path) * 100)
+                self.progress.emit(percent)
+
+        first = read_image(im_path[0]) if im_path else None
+        return {
+            'im_path': im_path,
+            'bnb_path': bnb_path,
+            'objects': all_objects,
+            'first': first
+        }
+
+
 class carUI(QWidget):
 
     def __init__(self, parent=None):
         super(carUI, self).__init__(parent)
-        loadUi('GUI/widget_vehicle.ui', self)
+        load_ui('GUI/widget_vehicle.ui', self)
+        preload_stylesheets('GUI/vehicle')
 
         self._mode = 'bnbox' # start the bnbox page at first
         self._data_path = None
         self._filename = ''
+        self._prefetcher = FramePrefetcher(prefetch_radius, cache_size_mb * 1024**2, parent=self)
+        self._writer = AnnotationWriter(parent=self)
+        self._writer.failed.connect(self.save_failed)
 
         self.pb_openfile.clicked.connect(self.file_open)
         self.pb_repeat.clicked.connect(self.reload_im_to_scene)
@@ -103,13 +157,11 @@ class carUI(QWidget):
         self.sw_canvas.setGeometry(63, 51, 1143, 850)
 
         self.canvas_bnbox = LabelCanvas(self, QRect(0, 0, 1143, 850))
-        self.canvas_bnbox.setViewportUpdateMode(0)
         self.canvas_bnbox.clear_items()
         self.canvas_bnbox.add_item_signal.connect(self.add_item_by_drag)
         self.canvas_bnbox.delete_item_signal.connect(self.delete_item_by_click)
 
         self.canvas_crop = CropCanvas(self, QRect(63, 51, 1143, 850))
-        self.canvas_crop.setViewportUpdateMode(0)
         self.canvas_crop.clear_all_items()
 
         self.sw_canvas.addWidget(self.canvas_bnbox)
@@ -199,9 +251,8 @@ class carUI(QWidget):
             # crop mode only read first image in image directory
             # bnbox read all images and bnboxes data 
             if self._mode == 'bnbox':    
-                self._im_path = glob(str(self._im_dir.joinpath(f'*.{dir_check[2]}')))
+                self._im_ext = dir_check[2]
                 self._bnb_dir = self._data_path.joinpath(dir_check[1])
-                self._bnb_path = glob(str(self._bnb_dir.joinpath('*.xml')))
                 self.thread_load_im_to_scene()
             elif self._mode == 'crop':
                 self._back_im_path = str(sorted(self._im_dir.glob('*.png'))[0])
@@ -210,9 +261,26 @@ class carUI(QWidget):
             warning_msg('Invalid directory !')
 
     def thread_load_im_to_scene(self):
-        loading_thread = threading.Thread(target=self.load_im_to_scene)
-        loading_thread.start()
-        loading_thread.join()
+        self.pb_add_class.setEnabled(False)
+        self.le_new_class.setEnabled(False)
+        self.pb_openfile.setEnabled(False)
+        self.pb_repeat.setEnabled(False)
+        self.pb_save.setEnabled(False)
+        self.pb_prev_frame.setEnabled(False)
+        self.pb_next_frame.setEnabled(False)
+
+        self.load_thread = QThread()
+        self.load_worker = LoadWorker(self._im_dir, self._bnb_dir, self._im_ext)
+        self.load_worker.moveToThread(self.load_thread)
+        self.load_thread.started.connect(self.load_worker.run)
+        self.load_worker.progress.connect(self.load_progress)
+        self.load_worker.finished.connect(self.bnbox_loaded)
+        self.load_worker.failed.connect(self.load_failed)
+        for signal in (self.load_worker.finished, self.load_worker.failed):
+            signal.connect(self.load_thread.quit)
+            signal.connect(self.load_worker.deleteLater)
+        self.load_thread.finished.connect(self.load_thread.deleteLater)
+        self.load_thread.start()
 
     def reload_im_to_scene(self):
         if self._mode == 'bnbox' and self.canvas_bnbox.hasPhoto():
@@ -223,45 +291,7 @@ class carUI(QWidget):
     def load_im_to_scene(self):
         
         if self._mode == 'bnbox':
-            self.pb_add_class.setEnabled(False)
-            self.le_new_class.setEnabled(False)
-            self.pb_openfile.setEnabled(False)
-            self.pb_save.setEnabled(False)
-            self.pb_prev_frame.setEnabled(False)
-            self.pb_next_frame.setEnabled(False)
-
-            if self._im_path:
-                self.le_total_frame.setText(f'/ {len(self._im_path) - 1}')
-                self.le_current_frame.setText('0')
-                self.saved = [0] * len(self._im_path)
-
-                # image corresponding bnboxes loading
-                self._all_bnboxes = []
-                for path in self._bnb_path:
-                    objects = parse_rec(path)
-                    bnboxes = []
-                    for obj in objects:
-                        x1, y1, x2, y2 = obj['bbox']
-                        item = RectItemHandle(x1, y1, x2-x1, y2-y1)
-                        item.setLabel(obj['name'])
-                        bnboxes.append(item)
-                        item.item_changed_signal.signal.connect(self.item_changed)
-
-                        if obj['name'] not in classes:
-                            classes.add(obj['name'])
-
-                    self._all_bnboxes.append(bnboxes)
-
-                self.canvas_bnbox.setPhoto(self._im_path[0])
-                self.canvas_bnbox.clear_items()
-                self.load_bndox_to_scene(index=0)
-
-            self.pb_add_class.setEnabled(True)
-            self.pb_next_frame.setEnabled(True)
-            self.le_new_class.setEnabled(True)
-            self.pb_openfile.setEnabled(True)
-            self.cb_label.setEnabled(True)
-            self.cb_label.setCurrentIndex(0)
+            self.thread_load_im_to_scene()
 
         elif self._mode == 'crop' and self._back_im_path:
             print(self._back_im_path)
@@ -274,8 +304,68 @@ class carUI(QWidget):
                 f'File: {self._filename}  Size: ({self.canvas_crop.back_im.shape[1]}, {self.canvas_crop.back_im.shape[0]})'
             )
 
+    def load_progress(self, percent: int):
+        self.le_total_frame.setText(f'{percent}%')
+
+    def bnbox_loaded(self, result: dict):
+        """ Receiving the `LoadWorker` result on the GUI thread """
+        self._im_path = result['im_path']
+        self._bnb_path = result['bnb_path']
+        self._all_objects = result['objects']
+        self.le_total_frame.setText('/ -')
+
+        if self._im_path:
+            self.le_total_frame.setText(f'/ {len(self._im_path) - 1}')
+            self.le_current_frame.setText('0')
+            self.saved = [0] * len(self._im_path)
+            self._im_size = {}
+
+            # bnbox items are built at the first visit of each frame
+            self._all_bnboxes = [None] * len(self._all_objects)
+            for objects in self._all_objects:
+                classes.update(obj['name'] for obj in objects)
+
+            self.canvas_bnbox.setDecodedPhoto(self._im_path[0], *result['first'])
+            if self.canvas_bnbox.back_im is not None:
+                self._im_size[0] = self.canvas_bnbox.back_im.shape[:2]
+            self.canvas_bnbox.clear_items()
+            self.load_bndox_to_scene(index=0)
+            self._prefetcher.reset(self._im_path)
+            self._prefetcher.prefetch(0)
+
+        self.pb_add_class.setEnabled(True)
+        self.pb_next_frame.setEnabled(True)
+        self.le_new_class.setEnabled(True)
+        self.pb_openfile.setEnabled(True)
+        self.pb_repeat.setEnabled(True)
+        self.cb_label.setEnabled(True)
+        self.cb_label.setCurrentIndex(0)
+
+    def load_failed(self, msg: str):
+        """ Re-enabling the directory loading after a `LoadWorker` error """
+        self.le_total_frame.setText('/ -')
+        self.pb_add_class.setEnabled(True)
+        self.le_new_class.setEnabled(True)
+        self.pb_openfile.setEnabled(True)
+        self.pb_repeat.setEnabled(True)
+        warning_msg(f'Loading {self._data_path} failed: {msg}')
+
+    def frame_bnboxes(self, index: int) -> list:
+        """ Return the bnbox items of frame `index`,
+        building them from the parsed annotations at first access. """
+        if self._all_bnboxes[index] is None:
+            bnboxes = []
+            for obj in self._all_objects[index]:
+                x1, y1, x2, y2 = obj['bbox']
+                item = RectItemHandle(x1, y1, x2-x1, y2-y1)
+                item.setLabel(obj['name'])
+                bnboxes.append(item)
+                item.item_changed_signal.signal.connect(self.item_changed)
+            self._all_bnboxes[index] = bnboxes
+        return self._all_bnboxes[index]
+
     def load_bndox_to_scene(self, index=0):
-        for it in self._all_bnboxes[index]:
+        for it in self.frame_bnboxes(index):
             self.canvas_bnbox.add_item_to_scene(it)
 
     def add_item_by_drag(self, pos):
@@ -303,12 +393,11 @@ class carUI(QWidget):
 
     def delete_item_by_click(self, pos):
         index = int(self.le_current_frame.text())
-        for i, it in enumerate(self._all_bnboxes[index]):
-            if it.rect().contains(pos):
-                del self._all_bnboxes[index][i]
-                self.canvas_bnbox.delete_item_on_scene(it)
-                self.item_changed()
-                break
+        it = self.canvas_bnbox.item_at(pos)
+        if it is not None:
+            self._all_bnboxes[index].remove(it)
+            self.canvas_bnbox.delete_item_on_scene(it)
+            self.item_changed()
 
     def delete_item_by_signal(self, it):
         del self._all_bnboxes[int(self.le_current_frame.text())][-1]
@@ -325,44 +414,74 @@ class carUI(QWidget):
             index = int(self.le_current_frame.text()) - 1
             if index < 0: return
 
+            if autosave and self.saved[index + 1]:
+                self.save_frame(index + 1)
             self.canvas_bnbox.clear_items()
             self.pb_next_frame.setEnabled(True)
             self.le_current_frame.setText(f'{index}')
-            self.canvas_bnbox._photo.setPixmap(QPixmap(self._im_path[index]))
+            self.show_frame(index)
             if index == 0:
                 self.pb_prev_frame.setEnabled(False)
             self.load_bndox_to_scene(index=index)
+            self._prefetcher.prefetch(index)
 
     def next_frame(self):
         index = int(self.le_current_frame.text()) + 1
         if index >= len(self._im_path): return
 
+        if autosave and self.saved[index - 1]:
+            self.save_frame(index - 1)
         self.canvas_bnbox.clear_items()
         self.pb_prev_frame.setEnabled(True)
         self.le_current_frame.setText(f'{index}')
-        self.canvas_bnbox._photo.setPixmap(QPixmap(self._im_path[index]))
+        self.show_frame(index)
         if index == len(self._im_path) - 1:
             self.pb_next_frame.setEnabled(False)
         self.load_bndox_to_scene(index=index)
+        self._prefetcher.prefetch(index)
+
+    def show_frame(self, index: int):
+        qim = self._prefetcher.frame(index)
+        self._im_size[index] = (qim.height(), qim.width())
+        self.canvas_bnbox._photo.setPixmap(QPixmap.fromImage(qim))
+
+    def frame_size(self, index: int) -> tuple:
+        """ Return the cached (h, w) of frame `index`, reading
+        the image header only for the frames never shown. """
+        if index not in self._im_size:
+            self._im_size[index] = image_size(self._im_path[index])
+        return self._im_size[index]
+
+    def save_frame(self, index: int):
+        """ Snapshotting the bnboxes of frame `index` on the
+        GUI thread and handing the writing to `self._writer` """
+        h, w = self.frame_size(index)
+        objects = []
+        for it in self._all_bnboxes[index]:
+            label = it.label.toPlainText()
+            coords = list(map(round, it.originRect().getCoords()))
+            coords = coords_correlated(coords, w, h)
+            if coords:
+                objects.append((label, coords))
+        self._writer.submit(index, self._bnb_path[index], self._im_path[index], w, h, objects)
+        self.saved[index] = 0
 
     def save_data(self):
         for i, s in enumerate(self.saved):
             if s:
-                h, w = cv2.imread(self._im_path[i]).shape[:2]
-                writer = Writer(self._im_path[i], w, h)
-                for it in self._all_bnboxes[i]:
-                    label = it.label.toPlainText()
-                    coords = list(map(round, it.originRect().getCoords()))
-                    coords = coords_correlated(coords, w, h)
-                    if coords:
-                        writer.addObject(label, *coords)
-                    else:
-                        continue
-                writer.save(self._bnb_path[i])
-
-        self.saved = [0] * len(self._im_path)
+                self.save_frame(i)
+
         self.le_current_frame.setText(self.le_current_frame.text())
-        self.pb_save.setEnabled(False)        
+        self.pb_save.setEnabled(False)
+
+    def save_failed(self, index: int, msg: str):
+        self.saved[index] = 1
+        self.pb_save.setEnabled(True)
+        warning_msg(f'Saving frame {index} failed: {msg}')
+
+    def closeEvent(self, event):
+        self._writer.wait()
+        super().closeEvent(event)
 
     def mouseDoubleClickEvent(self, event):
         if self._mode == 'crop': 
@@ -429,14 +548,15 @@ class carUI(QWidget):
 
         self.le_crop_info.setText('')
         self.bar_extract.setTextVisible(True)
-        paths = glob(str(data.im_path.joinpath('*.png')))
-        for i, path in enumerate(paths):
-            data.extract(path)
-            self.bar_extract.setValue(int(round((i+1)/len(paths)*100)))
-        data.split()
+        paths = data.frame_paths()
+        with stage('extract_frames', frames=len(paths)):
+            for i, path in enumerate(paths):
+                data.extract(path)
+                self.bar_extract.setValue(int(round((i+1)/len(paths)*100)))
+            data.split()
         self.bar_extract.setValue(0)
         self.bar_extract.setTextVisible(False)
-        self.le_crop_info.setText('Completed !')
+        self.le_crop_info.setText(f"Completed ! {summary('extract_frames')}")
 
         self.pb_save.setEnabled(True)
         self.cb_angle.setEnabled(True)
@@ -3,13 +3,12 @@ os.environ["OPENCV_IO_MAX_IMAGE_PIXELS"] = pow(2, 40).__str__()
 
 import numpy as np
 import threading
-from glob import glob
 from pathlib import Path
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
-from PyQt5.uic import loadUi
 
+from ...common.uiloader import load_ui
 from ..dialog.error import warning_msg
 from ..ODCrop import ODCropData
 from ..item import RectItem, CropCanvas
@@ -26,7 +25,7 @@ angles = {
 class cropUI(QWidget):    
     def __init__(self, parent=None):
         super(cropUI, self).__init__(parent)
-        loadUi('GUI/widget_crop.ui', self)
+        load_ui('GUI/widget_crop.ui', self)
 
         self._back_im_path = ''
         self._data_path = ''
@@ -36,7 +35,6 @@ class cropUI(QWidget):
 
         geometry = self.canvas.geometry()
         self.canvas = CropCanvas(self, geometry)
-        self.canvas.setViewportUpdateMode(0)
         self.canvas.clear_all_items()
 
         self.lineEdit_info.setReadOnly(True)
@@ -113,7 +111,7 @@ class cropUI(QWidget):
 
         self.lineEdit_info.setText('')
         self.progressBar_extract.setTextVisible(True)
-        paths = glob(str(data.im_path.joinpath('*.png')))
+        paths = data.frame_paths()
         for i, path in enumerate(paths):
             data.extract(path)
             self.progressBar_extract.setValue(int(round((i+1)/len(paths)*100)))
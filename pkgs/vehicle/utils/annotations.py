@@ -0,0 +1,90 @@
+import json
+import numpy as np
+from pathlib import Path
+
+
+class CocoAnnotations(object):
+
+    def __init__(self, classes: list):
+        """ Accumulating the annotations of the extracted crops
+        into arrays, saved once as a single COCO JSON file
+        rather than an annotation file per crop.
+
+        # Args:
+            classes (list): class names, numbered from 1 in this order
+        """
+        self.images = []
+        self.categories = {name: i for i, name in enumerate(classes, 1)}
+        self._boxes = []
+
+    def category_id(self, name: str) -> int:
+        """ Category id of `name` """
+        if name not in self.categories:
+            raise ValueError(f'Unknown class {name}, expected one of {list(self.categories)}.')
+        return self.categories[name]
+
+    def add(self, file_name: str, width: int, height: int, objects: list) -> np.ndarray:
+        """ Adding a crop and its objects
+
+        # Args:
+            file_name (str): crop image file name
+            width, height (int): crop size
+            objects (list of dict): Pascal VOC objects ('name', 'bbox')
+
+        # Returns:
+            (K, 5) numpy.ndarray of [category id, xmin, ymin, xmax, ymax]
+        """
+        self.images.append((file_name, width, height))
+        boxes = np.array([[self.category_id(obj['name']), *obj['bbox']] for obj in objects],
+                         dtype=np.int64).reshape(-1, 5)
+        image_ids = np.full((len(boxes), 1), len(self.images), dtype=np.int64)
+        self._boxes.append(np.hstack([image_ids, boxes]))
+        return boxes
+
+    def to_coco(self) -> dict:
+        boxes = np.concatenate(self._boxes) if self._boxes else np.empty((0, 6), dtype=np.int64)
+        image_ids, cat_ids = boxes[:, 0], boxes[:, 1]
+        # the Pascal VOC corners of the crops are the 1-based pixel edges (the
+        # right/bottom ones exclusive), COCO boxes are 0-based [x, y, w, h]
+        xywh = np.stack([boxes[:, 2] - 1, boxes[:, 3] - 1,
+                         boxes[:, 4] - boxes[:, 2], boxes[:, 5] - boxes[:, 3]], axis=1)
+        areas = xywh[:, 2] * xywh[:, 3]
+
+        return {
+            'images': [{'id': i, 'file_name': fn, 'width': int(w), 'height': int(h)}
+                       for i, (fn, w, h) in enumerate(self.images, 1)],
+            'annotations': [{'id': i, 'image_id': im_id, 'category_id': cat_id,
+                             'bbox': bbox, 'area': area, 'iscrowd': 0}
+                            for i, (im_id, cat_id, bbox, area) in enumerate(zip(
+                                image_ids.tolist(), cat_ids.tolist(), xywh.tolist(), areas.tolist()), 1)],
+            'categories': [{'id': i, 'name': name} for name, i in self.categories.items()],
+        }
+
+    def save(self, path):
+        with open(str(path), 'w') as file:
+            json.dump(self.to_coco(), file)
+
+    def save_classes(self, path):
+        """ Writing the class names in YOLO class index order """
+        Path(path).write_text('\n'.join(self.categories))
+
+
+def yolo_labels(boxes: np.ndarray, width: int, height: int) -> bytes:
+    """ YOLO label file content of the crop boxes
+
+    # Args:
+        boxes (numpy.ndarray): (K, 5) [category id, xmin, ymin, xmax, ymax]
+            as returned by `CocoAnnotations.add`
+        width, height (int): crop size
+
+    # Returns:
+        `class cx cy w h` lines, 0-based classes and normalized coordinates
+    """
+    if not len(boxes):
+        return b''
+    xmin, ymin, xmax, ymax = (boxes[:, 1:] - 1).T
+    labels = np.stack([(xmin + xmax) / 2 / width, (ymin + ymax) / 2 / height,
+                       (xmax - xmin) / width, (ymax - ymin) / height], axis=1)
+    lines = [f'{c} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}'
+             for c, (cx, cy, w, h) in zip((boxes[:, 0] - 1).tolist(), labels.tolist())]
+    return '\n'.join(lines).encode()
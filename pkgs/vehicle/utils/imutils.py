@@ -0,0 +1,44 @@
+import numpy as np
+from typing import Tuple
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+from ...common.lazy import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+def read_image(path: str) -> Tuple[np.ndarray, QImage]:
+    """ Decoding the image once into a RGB array and
+    wrapping the same buffer as QImage without copying.
+
+    The QImage refers to the array memory, so the
+    array must be kept alive as long as the QImage.
+
+    # Args:
+        path (str): image path
+
+    # Returns:
+        (array, qimage), (None, null QImage) if unreadable
+    """
+    im = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    if im is None:
+        return None, QImage()
+
+    cv2.cvtColor(im, cv2.COLOR_BGR2RGB, dst=im)
+    height, width, _ = im.shape
+    qim = QImage(im.data, width, height, im.strides[0], QImage.Format_RGB888)
+    return im, qim
+
+
+def image_size(path: str) -> Tuple[int, int]:
+    """ Reading the image dimensions
+    from file header without decoding pixels.
+
+    # Returns:
+        (height, width)
+    """
+    size = QImageReader(str(path)).size()
+    if not size.isValid():
+        raise ValueError(f'Unable to read the image header of {path}.')
+    return size.height(), size.width()
@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
+
+
+def decode_frame(path: str) -> QImage:
+    """ Decoding the image file into QImage,
+    safe to be called outside the GUI thread. """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    return reader.read()
+
+
+class FrameCache(object):
+
+    def __init__(self, max_bytes: int):
+        """ LRU cache of decoded frames bounded by memory
+
+        # Args:
+            max_bytes (int): upper bound of the total decoded bytes
+        """
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> QImage:
+        with self._lock:
+            image = self._frames.get(key)
+            if image is not None:
+                self._frames.move_to_end(key)
+            return image
+
+    def put(self, key: str, image: QImage):
+        size = image.sizeInBytes()
+        if size > self.max_bytes: return
+
+        with self._lock:
+            if key in self._frames:
+                self._nbytes -= self._frames.pop(key).sizeInBytes()
+            self._frames[key] = image
+            self._nbytes += size
+            while self._nbytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self._nbytes -= evicted.sizeInBytes()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._frames
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._nbytes = 0
+
+
+class _DecodeTask(QRunnable):
+
+    def __init__(self, path: str, wanted, callback):
+        super().__init__()
+        self.path = path
+        self.wanted = wanted
+        self.callback = callback
+
+    def run(self):
+        # skipping the frames which navigation has already moved away from
+        image = decode_frame(self.path) if self.wanted(self.path) else QImage()
+        self.callback(self.path, image)
+
+
+class FramePrefetcher(QObject):
+
+    def __init__(self, radius: int=3, max_bytes: int=1024**3, parent=None):
+        """ Decoding the neighbouring frames of the current
+        one on worker threads, so frame switching only
+        swaps in the decoded image from the cache.
+
+        # Args:
+            radius (int): number of frames prefetched on each side
+            max_bytes (int): memory bound of the frame cache
+        """
+        super().__init__(parent)
+        self.radius = radius
+        self._paths = []
+        self._window = set()
+        self._cache = FrameCache(max_bytes)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(radius, QThread.idealThreadCount() - 1)))
+
+    def reset(self, paths: list):
+        """ Replacing the frame sequence and dropping the cached frames """
+        self._paths = list(paths)
+        self._window = set()
+        self._cache.clear()
+
+    def frame(self, index: int) -> QImage:
+        """ Return the decoded frame at `index`, waiting for the
+        in-flight decoding or decoding it directly on cache miss. """
+        path = self._paths[index]
+        image = self._cache.get(path)
+        if image is not None:
+            return image
+
+        with self._lock:
+            event = self._pending.get(path)
+        if event is not None:
+            event.wait()
+            image = self._cache.get(path)
+            if image is not None:
+                return image
+
+        image = decode_frame(path)
+        if not image.isNull():
+            self._cache.put(path, image)
+        return image
+
+    def prefetch(self, index: int):
+        """ Scheduling the decoding of frames around `index`,
+        the closest neighbours first. """
+        lo, hi = max(0, index - self.radius), min(len(self._paths), index + self.radius + 1)
+        self._window = set(self._paths[lo:hi])
+        for offset in range(1, self.radius + 1):
+            for i in (index + offset, index - offset):
+                if lo <= i < hi:
+                    self._schedule(self._paths[i])
+
+    def _schedule(self, path: str):
+        if path in self._cache: return
+        with self._lock:
+            if path in self._pending: return
+            self._pending[path] = threading.Event()
+        self._pool.start(_DecodeTask(path, self._wanted, self._decoded))
+
+    def _wanted(self, path: str) -> bool:
+        return path in self._window
+
+    def _decoded(self, path: str, image: QImage):
+        if not image.isNull() and self._wanted(path):
+            self._cache.put(path, image)
+        with self._lock:
+            event = self._pending.pop(path, None)
+        if event is not None:
+            event.set()
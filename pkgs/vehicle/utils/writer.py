@@ -0,0 +1,83 @@
+import os
+import threading
+from PyQt5.QtCore import *
+
+from ...common.lazy import lazy_import
+
+pascal_voc_writer = lazy_import('pascal_voc_writer')
+
+
+class _WriteTask(QRunnable):
+
+    def __init__(self, index: int, version: int, args: tuple, owner):
+        super().__init__()
+        self.index = index
+        self.version = version
+        self.args = args
+        self.owner = owner
+
+    def run(self):
+        self.owner._write(self.index, self.version, *self.args)
+
+
+class AnnotationWriter(QObject):
+
+    saved = pyqtSignal(int)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, max_workers: int=4, parent=None):
+        """ Writing the Pascal VOC annotations on a thread pool.
+
+        Each file is written to a temporary file then renamed
+        over the origin one, so a crash never leaves a truncated
+        annotation, and only the latest submitted version of a
+        frame replaces the file.
+
+        # Args:
+            max_workers (int): number of writing threads
+        """
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def submit(self, index: int, bnb_path: str, im_path: str, w: int, h: int, objects: list):
+        """ Queueing the annotation of frame `index`
+
+        # Args:
+            bnb_path (str): annotation (.xml) path
+            im_path (str): image path recorded in the annotation
+            w, h (int): image width and height
+            objects (list of tuple): (label, [xmin, ymin, xmax, ymax])
+        """
+        with self._lock:
+            version = self._versions.get(bnb_path, 0) + 1
+            self._versions[bnb_path] = version
+        self._pool.start(_WriteTask(index, version, (bnb_path, im_path, w, h, objects), self))
+
+    def wait(self):
+        """ Blocking until all the queued annotations are written """
+        self._pool.waitForDone()
+
+    def _write(self, index, version, bnb_path, im_path, w, h, objects):
+        tmp_path = f'{bnb_path}.{version}.tmp'
+        try:
+            writer = pascal_voc_writer.Writer(im_path, w, h)
+            for label, coords in objects:
+                writer.addObject(label, *coords)
+            writer.save(tmp_path)
+
+            with self._lock:
+                latest = self._versions[bnb_path] == version
+                if latest:
+                    os.replace(tmp_path, bnb_path)
+            if not latest:
+                os.remove(tmp_path)
+        except Exception as err:
+            # QRunnable swallows the exceptions, the frame is reported
+            # so that the GUI marks it unsaved again
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+            self.failed.emit(index, str(err))
+        else:
+            self.saved.emit(index)